@@ -1,3 +1,4 @@
+import os
 import time
 import redis
 import json
@@ -5,6 +6,7 @@ from flask import Blueprint, jsonify
 from app.services.import_service import ImportService
 from app.utils.sse import SSEHelper
 from app.utils.progress_tracker import ProgressTracker
+from app.utils.http_cache import HTTPCache
 
 job_bp = Blueprint('jobs', __name__)
 
@@ -59,4 +61,29 @@ def get_job(job_id: str):
     if progress_data:
         response['live_progress'] = progress_data
     
-    return jsonify(response), 200
+    # Job rows have no updated_at; the payload is small enough to hash
+    return HTTPCache.respond(HTTPCache.etag(response), lambda: response, 'private, no-cache')
+
+@job_bp.route('/<job_id>/resume', methods=['POST'])
+def resume_job(job_id: str):
+    job = ImportService.get_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job.status != 'FAILURE':
+        return jsonify({'error': f'Only failed jobs can be resumed (status is {job.status})'}), 409
+    
+    if not job.filepath or not os.path.exists(job.filepath):
+        return jsonify({'error': 'The uploaded file is no longer available; upload it again'}), 409
+    
+    from app.tasks.csv_import import process_csv_import
+    
+    ImportService.reset_for_resume(job)
+    process_csv_import.delay(job.id, job.filepath, job.options or {})
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': 'PENDING',
+        'resume_from_row': job.checkpoint.get('row') if job.checkpoint else 0
+    }), 202
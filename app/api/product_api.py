@@ -1,39 +1,113 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from app.services.product_service import ProductService
+from app.utils.fast_json import FastJSON
+from app.utils.http_cache import HTTPCache
 
 product_bp = Blueprint('products', __name__)
 
+def parse_filter_args(args) -> dict:
+    """Reads the sku, name, description and active filters of the list and export endpoints."""
+    active = args.get('active')
+    if active is not None:
+        active = active.lower() in ('true', '1', 'yes')
+    
+    return {
+        'sku': args.get('sku'),
+        'name': args.get('name'),
+        'description': args.get('description'),
+        'active': active
+    }
+
 @product_bp.route('', methods=['GET'])
 def list_products():
-    sku = request.args.get('sku')
-    name = request.args.get('name')
-    description = request.args.get('description')
-    active = request.args.get('active')
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
+    cursor = request.args.get('cursor')
+    
+    def build():
+        return FastJSON.dumps(ProductService.get_products(
+            **parse_filter_args(request.args),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count=request.args.get('count', 'exact').lower(),
+            fields=ProductService.parse_fields(request.args.get('fields'))
+        ))
     
-    if active is not None:
-        active = active.lower() in ('true', '1', 'yes')
+    try:
+        generation = ProductService.listing_generation()
+        if generation is not None:
+            # Unchanged catalog and arguments: revalidated without touching the database
+            tag = HTTPCache.etag('products', generation, sorted(request.args.items(multi=True)))
+            return HTTPCache.respond(tag, build, render=FastJSON.response)
+        
+        body = build()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    result = ProductService.get_products(
-        sku=sku,
-        name=name,
-        description=description,
-        active=active,
-        limit=limit,
-        offset=offset
-    )
+    return HTTPCache.respond(HTTPCache.body_etag(body), lambda: body, render=FastJSON.response)
+
+@product_bp.route('/search', methods=['GET'])
+def search_products():
+    try:
+        result = ProductService.search_products(
+            q=request.args.get('q'),
+            active=parse_filter_args(request.args)['active'],
+            limit=int(request.args.get('limit', 50)),
+            offset=int(request.args.get('offset', 0)),
+            count=request.args.get('count', 'exact').lower()
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify(result), 200
 
+@product_bp.route('/sku-suggest', methods=['GET'])
+def suggest_skus():
+    prefix = request.args.get('prefix', '')
+    
+    try:
+        skus = ProductService.suggest_skus(prefix, limit=int(request.args.get('limit', 10)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'prefix': prefix, 'skus': skus}), 200
+
+@product_bp.route('/export', methods=['GET'])
+def export_products():
+    export_format = request.args.get('format', 'csv').lower()
+    
+    if export_format not in ProductService.EXPORT_FORMATS:
+        return jsonify({'error': f"Invalid export format '{export_format}'. Use csv or ndjson"}), 400
+    
+    filters = ProductService.build_filters(**parse_filter_args(request.args))
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(ProductService.export_products(export_format, filters)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=products.{export_format}'}
+    )
+
 @product_bp.route('/<int:product_id>', methods=['GET'])
 def get_product(product_id: int):
-    product = ProductService.get_product_by_id(product_id)
+    product = ProductService.get_product_payload(product_id)
+    
+    if not product:
+        return jsonify({'error': 'Product not found'}), 404
+    
+    tag = HTTPCache.etag(product['id'], product['updated_at'])
+    return HTTPCache.respond(tag, lambda: product, 'public, no-cache')
+
+@product_bp.route('/sku/<path:sku>', methods=['GET'])
+def get_product_by_sku(sku: str):
+    product = ProductService.get_product_payload_by_sku(sku)
     
     if not product:
         return jsonify({'error': 'Product not found'}), 404
     
-    return jsonify(product.to_dict()), 200
+    tag = HTTPCache.etag(product['id'], product['updated_at'])
+    return HTTPCache.respond(tag, lambda: product, 'public, no-cache')
 
 @product_bp.route('', methods=['POST'])
 def create_product():
@@ -53,6 +127,25 @@ def create_product():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@product_bp.route('/batch', methods=['POST'])
+def batch_products():
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'Send {"operations": [...]} with at least one operation'}), 400
+    
+    max_operations = current_app.config['PRODUCT_BATCH_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        return jsonify({'error': f'At most {max_operations} operations per batch'}), 413
+    
+    try:
+        result = ProductService.apply_batch(operations)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result), 200
+
 @product_bp.route('/<int:product_id>', methods=['PUT'])
 def update_product(product_id: int):
     data = request.get_json()
@@ -87,12 +180,21 @@ def delete_all_products():
     if confirmation != 'DELETE_ALL':
         return jsonify({'error': 'Confirmation required. Send {"confirmation": "DELETE_ALL"}'}), 400
     
+    # Optional {"active": false, "sku_prefix": "OLD-", "updated_before": "2026-01-01T00:00:00"}
+    filters = data.get('filters') or None
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({'error': 'filters must be an object'}), 400
+    try:
+        ProductService.build_delete_filters(filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     from app.services.import_service import ImportService
     from app.tasks.bulk_delete import bulk_delete_products
     
-    job = ImportService.create_import_job('bulk_delete_products.csv')
+    job = ImportService.create_import_job('bulk_delete_products.csv', options={'filters': filters})
     
-    bulk_delete_products.delay(job.id)
+    bulk_delete_products.delay(job.id, filters)
     
     return jsonify({
         'job_id': job.id,
@@ -2,9 +2,14 @@ from flask import Blueprint, request, jsonify, current_app
 from werkzeug.exceptions import BadRequest
 from app.services.import_service import ImportService
 from app.tasks.csv_import import process_csv_import
+from app.utils.csv_reader import CSVReader
+from app.utils.import_reader import ImportReader
+from app.utils.spool import UploadSpool
 
 upload_bp = Blueprint('upload', __name__)
 
+INVALID_FILE_TYPE = 'Invalid file type. Allowed: CSV (optionally .gz, .zst or .zip), NDJSON, Parquet and Arrow files'
+
 @upload_bp.route('/products/upload', methods=['POST'])
 def upload_csv():
     if 'file' not in request.files:
@@ -16,14 +21,20 @@ def upload_csv():
         return jsonify({'error': 'No file selected'}), 400
     
     if not ImportService.is_valid_file(file.filename):
-        return jsonify({'error': 'Invalid file type. Only CSV files are allowed'}), 400
+        return jsonify({'error': INVALID_FILE_TYPE}), 400
+    
+    try:
+        options = ImportService.get_import_options(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    options['format'] = ImportService.detect_upload_format(file)
     
     try:
-        job = ImportService.create_import_job(file.filename)
-        
         filepath = ImportService.save_upload_file(file, current_app.config['UPLOAD_FOLDER'])
         
-        process_csv_import.delay(job.id, filepath)
+        job = ImportService.create_import_job(file.filename, filepath=filepath, options=options)
+        
+        process_csv_import.delay(job.id, filepath, options)
         
         return jsonify({
             'job_id': job.id,
@@ -34,6 +45,53 @@ def upload_csv():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@upload_bp.route('/products/upload/stream', methods=['POST', 'PUT'])
+def upload_csv_stream():
+    """
+    Streaming upload: the raw request body is the CSV file and the filename
+    and import options are query parameters. The import is enqueued before
+    the body is read, and the worker imports rows while they are still
+    arriving in the spool file.
+    """
+    filename = request.args.get('filename') or request.headers.get('X-Filename', '')
+    
+    if filename == '':
+        return jsonify({'error': 'No filename provided'}), 400
+    
+    if not ImportService.is_valid_file(filename):
+        return jsonify({'error': INVALID_FILE_TYPE}), 400
+    
+    file_format = ImportReader.detect_format(filename)
+    # Zip directories and Parquet/Arrow footers sit at the end of the file, so they cannot be read while arriving
+    if CSVReader.compression_for(filename) == 'zip' or not ImportReader.for_format(file_format).STREAMABLE:
+        return jsonify({'error': 'This file type cannot be streamed; use CSV or NDJSON, optionally as .gz or .zst'}), 400
+    
+    try:
+        options = ImportService.get_import_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    options['stream'] = True
+    options['format'] = file_format
+    
+    try:
+        filepath = ImportService.create_upload_spool(filename, current_app.config['UPLOAD_FOLDER'])
+    
+        job = ImportService.create_import_job(filename, filepath=filepath, options=options)
+    
+        process_csv_import.delay(job.id, filepath, options)
+    
+        received = UploadSpool.write(request.stream, filepath)
+    
+        return jsonify({
+            'job_id': job.id,
+            'filename': filename,
+            'status': 'PENDING',
+            'bytes_received': received
+        }), 202
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @upload_bp.route('/uploads/recent', methods=['GET'])
 def get_recent_uploads():
     """Get recent upload jobs with their progress."""
@@ -32,6 +32,35 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/uploads')
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024
     
+    # 'values' runs multi-row INSERT ... ON CONFLICT batches, 'copy' streams
+    # rows through a COPY staging table (PostgreSQL only)
+    IMPORT_ENGINE = os.getenv('IMPORT_ENGINE', 'values')
+    # Number of byte ranges a parallel import is split into, one Celery sub-task each
+    IMPORT_PARALLEL_CHUNKS = int(os.getenv('IMPORT_PARALLEL_CHUNKS', 4))
+    # Validate rows as pandas DataFrames of IMPORT_FRAME_ROWS rows instead of one by one
+    IMPORT_COLUMNAR = os.getenv('IMPORT_COLUMNAR', 'false').lower() in ('true', '1', 'yes')
+    IMPORT_FRAME_ROWS = int(os.getenv('IMPORT_FRAME_ROWS', 10000))
+    # Parse in a background thread that stays at most IMPORT_QUEUE_DEPTH batches ahead of the DB writer
+    IMPORT_PIPELINE = os.getenv('IMPORT_PIPELINE', 'false').lower() in ('true', '1', 'yes')
+    IMPORT_QUEUE_DEPTH = int(os.getenv('IMPORT_QUEUE_DEPTH', 4))
+    # Pre-pass that collapses repeated SKUs across the whole file before writing
+    IMPORT_DEDUPE = os.getenv('IMPORT_DEDUPE', 'false').lower() in ('true', '1', 'yes')
+    # A streamed upload that receives no bytes for this many seconds fails the import
+    IMPORT_STREAM_IDLE_TIMEOUT = int(os.getenv('IMPORT_STREAM_IDLE_TIMEOUT', 300))
+    # Example rows of each kind of change kept by a dry-run import
+    IMPORT_DRY_RUN_SAMPLE = int(os.getenv('IMPORT_DRY_RUN_SAMPLE', 20))
+    
+    # Redis caching of read results; reads fall back to the database when Redis is down
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    # Seconds a product list total is reused for an identical filter set
+    PRODUCT_COUNT_CACHE_TTL = int(os.getenv('PRODUCT_COUNT_CACHE_TTL', 30))
+    # Seconds a product looked up by id or SKU stays cached in Redis
+    PRODUCT_CACHE_TTL = int(os.getenv('PRODUCT_CACHE_TTL', 300))
+    # Largest number of operations accepted by POST /api/products/batch
+    PRODUCT_BATCH_MAX_OPERATIONS = int(os.getenv('PRODUCT_BATCH_MAX_OPERATIONS', 5000))
+    # Products removed per DELETE statement and commit by bulk deletes
+    BULK_DELETE_RANGE_SIZE = int(os.getenv('BULK_DELETE_RANGE_SIZE', 10000))
+    
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
 
 class DevelopmentConfig(Config):
@@ -46,10 +75,16 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_ENGINE_OPTIONS = {}
+    CACHE_ENABLED = False
+
+class BenchmarkConfig(TestingConfig):
+    # The benchmark suite empties the products table of this database
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite:///:memory:')
 
 config_by_name = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
     'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
@@ -11,7 +11,24 @@ class ImportJob(db.Model):
     processed_rows = db.Column(db.Integer, default=0)
     success_count = db.Column(db.Integer, default=0)
     error_count = db.Column(db.Integer, default=0)
+    inserted_count = db.Column(db.Integer, default=0)
+    updated_count = db.Column(db.Integer, default=0)
+    # Rows that matched an existing product value for value and were not rewritten
+    unchanged_count = db.Column(db.Integer, default=0)
+    # Valid rows collapsed into a later row with the same SKU by the dedupe pre-pass
+    duplicate_count = db.Column(db.Integer, default=0)
+    # Products removed because a replace import did not contain them
+    deleted_count = db.Column(db.Integer, default=0)
     error_message = db.Column(db.Text)
+    filepath = db.Column(db.String(1000))
+    options = db.Column(db.JSON)
+    # Last committed batch of a running import: byte offset, row number,
+    # encoding, headers and running counters, used to resume after a failure
+    checkpoint = db.Column(db.JSON)
+    # Stage timing breakdown and throughput of the finished import (see ImportMetrics)
+    metrics = db.Column(db.JSON)
+    # Diff summary and sample changes of a dry-run import, which writes no products
+    preview = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime)
     
@@ -24,7 +41,16 @@ class ImportJob(db.Model):
             'processed_rows': self.processed_rows,
             'success_count': self.success_count,
             'error_count': self.error_count,
+            'inserted_count': self.inserted_count,
+            'updated_count': self.updated_count,
+            'unchanged_count': self.unchanged_count,
+            'duplicate_count': self.duplicate_count,
+            'deleted_count': self.deleted_count,
             'error_message': self.error_message,
+            'options': self.options,
+            'metrics': self.metrics,
+            'preview': self.preview,
+            'checkpoint_row': self.checkpoint.get('row') if self.checkpoint else None,
             'progress': self.get_progress(),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
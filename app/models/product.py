@@ -13,8 +13,11 @@ class Product(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # The PostgreSQL-only trigram and full-text search indexes are created by
+    # migration 9a5d27c4e1f0 and are not declared here
     __table_args__ = (
         db.Index('ix_products_sku_lower', db.text('LOWER(sku)'), unique=True),
+        db.Index('ix_products_created_at_id', 'created_at', 'id'),
     )
     
     def to_dict(self):
@@ -4,21 +4,89 @@ from datetime import datetime
 from werkzeug.utils import secure_filename
 from app.extensions import db
 from app.models.import_job import ImportJob
+from app.utils.import_reader import ImportReader
 
 class ImportService:
     
-    ALLOWED_EXTENSIONS = {'csv'}
+    IMPORT_ENGINES = {'values', 'copy'}
     
     @staticmethod
     def is_valid_file(filename: str) -> bool:
-        return '.' in filename and filename.rsplit('.', 1)[1].lower() in ImportService.ALLOWED_EXTENSIONS
+        """True for CSV (optionally .gz, .zst or .zip), NDJSON, Parquet and Arrow file names."""
+        return ImportReader.detect_format(filename) is not None
     
     @staticmethod
-    def create_import_job(filename: str) -> ImportJob:
+    def detect_upload_format(file) -> str:
+        """Format of an uploaded FileStorage from its leading bytes and name; the stream is rewound."""
+        head = file.stream.read(8)
+        file.stream.seek(0)
+        return ImportReader.detect_format(file.filename, head)
+    
+    @staticmethod
+    def get_import_options(form) -> dict:
+        """Builds the import task options from upload form fields. Raises ValueError on bad input."""
+        options = {}
+        
+        engine = form.get('engine')
+        if engine:
+            engine = engine.lower()
+            if engine not in ImportService.IMPORT_ENGINES:
+                raise ValueError(f"Invalid import engine '{engine}'. Use one of: {', '.join(sorted(ImportService.IMPORT_ENGINES))}")
+            options['engine'] = engine
+        
+        if form.get('columnar') is not None:
+            options['columnar'] = ImportService._is_true(form.get('columnar'))
+        
+        if form.get('pipeline') is not None:
+            options['pipeline'] = ImportService._is_true(form.get('pipeline'))
+        
+        if form.get('dedupe') is not None:
+            options['dedupe'] = ImportService._is_true(form.get('dedupe'))
+        
+        # The file becomes the whole catalog; products it does not list are deleted
+        if ImportService._is_true(form.get('replace')):
+            options['replace'] = True
+        
+        # Validate and compare with the catalog without writing (see CopyLoader.diff)
+        if ImportService._is_true(form.get('dry_run')):
+            options['dry_run'] = True
+        
+        queue_depth = form.get('queue_depth')
+        if queue_depth:
+            try:
+                queue_depth = int(queue_depth)
+            except ValueError:
+                raise ValueError('queue_depth must be an integer')
+            if not 1 <= queue_depth <= 64:
+                raise ValueError('queue_depth must be between 1 and 64')
+            options['queue_depth'] = queue_depth
+        
+        if ImportService._is_true(form.get('parallel')):
+            options['parallel'] = True
+            chunks = form.get('chunks')
+            if chunks:
+                try:
+                    chunks = int(chunks)
+                except ValueError:
+                    raise ValueError('chunks must be an integer')
+                if not 1 <= chunks <= 64:
+                    raise ValueError('chunks must be between 1 and 64')
+                options['chunks'] = chunks
+        
+        return options
+    
+    @staticmethod
+    def _is_true(value) -> bool:
+        return value is not None and str(value).lower() in ('true', '1', 'yes')
+    
+    @staticmethod
+    def create_import_job(filename: str, filepath: str = None, options: dict = None) -> ImportJob:
         job_id = str(uuid.uuid4())
         job = ImportJob(
             id=job_id,
             filename=filename,
+            filepath=filepath,
+            options=options,
             status='PENDING',
             total_rows=0,
             processed_rows=0,
@@ -31,15 +99,27 @@ class ImportService:
     
     @staticmethod
     def save_upload_file(file, upload_folder: str) -> str:
-        filename = secure_filename(file.filename)
+        filepath = ImportService._upload_path(file.filename, upload_folder)
+        file.save(filepath)
+        
+        return filepath
+    
+    @staticmethod
+    def create_upload_spool(filename: str, upload_folder: str) -> str:
+        """Creates the empty spool file a streamed upload is written into."""
+        filepath = ImportService._upload_path(filename, upload_folder)
+        open(filepath, 'wb').close()
+        
+        return filepath
+    
+    @staticmethod
+    def _upload_path(filename: str, upload_folder: str) -> str:
+        filename = secure_filename(filename)
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         unique_filename = f"{timestamp}_{uuid.uuid4().hex[:8]}_{filename}"
         
         os.makedirs(upload_folder, exist_ok=True)
-        filepath = os.path.join(upload_folder, unique_filename)
-        file.save(filepath)
-        
-        return filepath
+        return os.path.join(upload_folder, unique_filename)
     
     @staticmethod
     def update_job_status(job_id: str, status: str, **kwargs):
@@ -53,6 +133,27 @@ class ImportService:
                 job.completed_at = datetime.utcnow()
             db.session.commit()
     
+    @staticmethod
+    def save_checkpoint(job_id: str, checkpoint: dict):
+        """Records the last committed batch so a retried or resumed import can continue after it."""
+        job = db.session.query(ImportJob).filter_by(id=job_id).first()
+        if job:
+            job.checkpoint = checkpoint
+            job.processed_rows = checkpoint['processed']
+            job.success_count = checkpoint['success']
+            job.error_count = checkpoint['errors']
+            job.inserted_count = checkpoint['inserted']
+            job.updated_count = checkpoint['updated']
+            job.unchanged_count = checkpoint['unchanged']
+            db.session.commit()
+    
+    @staticmethod
+    def reset_for_resume(job: ImportJob):
+        job.status = 'PENDING'
+        job.error_message = None
+        job.completed_at = None
+        db.session.commit()
+    
     @staticmethod
     def get_recent_jobs(limit: int = 10):
         """Get recent import jobs ordered by creation date."""
@@ -1,21 +1,44 @@
-from typing import List, Dict, Any, Optional
-from sqlalchemy import or_, and_
+import base64
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+from collections import Counter
+from sqlalchemy import or_, and_, select, tuple_, case, func, literal_column, update, delete
+from flask import current_app
 from app.extensions import db
 from app.models.product import Product
+from app.utils.db_helper import DatabaseHelper
+from app.utils.lru_cache import LRUCache
+from app.utils.redis_cache import RedisCache
 
 class ProductService:
     
+    EXPORT_FORMATS = {'csv', 'ndjson'}
+    # The keys of Product.to_dict()
+    PRODUCT_FIELDS = ['id', 'sku', 'name', 'description', 'price', 'active', 'created_at', 'updated_at']
+    COUNT_MODES = ('exact', 'estimate', 'none')
+    # Planner estimates below this are replaced by an exact count, which is cheap at that size
+    ESTIMATE_EXACT_BELOW = 1000
+    SUGGEST_LIMIT_MAX = 50
+    BATCH_OPERATIONS = ('upsert', 'patch', 'delete')
+    PATCH_FIELDS = ('name', 'description', 'price', 'active')
+    # (catalog generation, prefix, limit) -> SKUs
+    _suggest_cache = LRUCache(maxsize=4096)
+    # Per-process copies of the Redis product payloads, kept briefly because
+    # invalidations from other processes cannot reach them
+    _product_cache = LRUCache(maxsize=4096, ttl=5)
+    
     @staticmethod
-    def get_products(
+    def build_filters(
         sku: Optional[str] = None,
         name: Optional[str] = None,
         description: Optional[str] = None,
-        active: Optional[bool] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> Dict[str, Any]:
-        query = db.session.query(Product)
-        
+        active: Optional[bool] = None
+    ) -> list:
+        """Filter clauses shared by the list and export endpoints."""
         filters = []
         if sku:
             filters.append(db.func.lower(Product.sku) == sku.lower())
@@ -25,29 +48,455 @@ class ProductService:
             filters.append(Product.description.ilike(f'%{description}%'))
         if active is not None:
             filters.append(Product.active == active)
+        return filters
+    
+    @staticmethod
+    def build_delete_filters(filters: Optional[Dict[str, Any]]) -> list:
+        """
+        Filter clauses of a bulk delete: active (bool), sku_prefix
+        (case-insensitive) and updated_before (ISO timestamp). Raises
+        ValueError on malformed values.
+        """
+        filters = filters or {}
+        unknown = set(filters) - {'active', 'sku_prefix', 'updated_before'}
+        if unknown:
+            raise ValueError(f"Unknown delete filter(s): {', '.join(sorted(unknown))}")
+        
+        clauses = []
+        if filters.get('active') is not None:
+            if not isinstance(filters['active'], bool):
+                raise ValueError('active must be a boolean')
+            clauses.append(Product.active == filters['active'])
+        
+        if filters.get('sku_prefix'):
+            pattern = ProductService.prefix_pattern(str(filters['sku_prefix']).strip().lower())
+            clauses.append(func.lower(Product.sku).like(pattern, escape='\\'))
+        
+        if filters.get('updated_before'):
+            try:
+                updated_before = datetime.fromisoformat(str(filters['updated_before']))
+            except ValueError:
+                raise ValueError('updated_before must be an ISO 8601 timestamp')
+            clauses.append(Product.updated_at < updated_before)
+        
+        return clauses
+    
+    @staticmethod
+    def get_products(
+        sku: Optional[str] = None,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        active: Optional[bool] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: str = 'exact',
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Pages newest first. Passing a cursor (an empty one for the first page)
+        switches from OFFSET to keyset paging on (created_at, id): each page
+        seeks past the last row of the previous one through the
+        ix_products_created_at_id index, so deep pages cost the same as the
+        first. The response then carries next_cursor, None on the last page.
+        Offset paging is kept for existing clients.
+        
+        count picks how total is computed (see count_products); total_exact
+        says whether it is an exact count.
+        
+        Only the columns behind fields (default: all of to_dict()) are
+        selected, as plain rows without ORM instances; see row_payloads.
+        """
+        if count not in ProductService.COUNT_MODES:
+            raise ValueError(f"Invalid count mode '{count}'. Use exact, estimate or none")
+        
+        fields = fields or ProductService.PRODUCT_FIELDS
+        # Keyset cursors are built from created_at and id
+        selected = [f for f in ProductService.PRODUCT_FIELDS if f in fields or f in ('id', 'created_at')]
+        query = db.session.query(*[getattr(Product, f) for f in selected])
+        
+        filters = ProductService.build_filters(sku, name, description, active)
         
         if filters:
             query = query.filter(and_(*filters))
         
-        total = query.count()
-        products = query.order_by(Product.created_at.desc()).limit(limit).offset(offset).all()
+        total, total_exact = ProductService.count_products(
+            query, count, [sku, name, description, active]
+        )
+        query = query.order_by(Product.created_at.desc(), Product.id.desc())
+        
+        if cursor is None:
+            products = query.limit(limit).offset(offset).all()
+            
+            return {
+                'products': ProductService.row_payloads(products, fields),
+                'total': total,
+                'total_exact': total_exact,
+                'limit': limit,
+                'offset': offset
+            }
+        
+        if cursor:
+            created_at, product_id = ProductService.decode_cursor(cursor)
+            query = query.filter(tuple_(Product.created_at, Product.id) < (created_at, product_id))
+        
+        # One extra row tells whether another page follows
+        products = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = ProductService.encode_cursor(products[-1])
+        
+        return {
+            'products': ProductService.row_payloads(products, fields),
+            'total': total,
+            'total_exact': total_exact,
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+    
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+        """Reads a comma-separated sparse fieldset such as 'sku,price'; None means all fields."""
+        if not fields:
+            return None
+        
+        requested = [f.strip().lower() for f in fields.split(',') if f.strip()]
+        unknown = [f for f in requested if f not in ProductService.PRODUCT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Use {', '.join(ProductService.PRODUCT_FIELDS)}")
+        return requested or None
+    
+    @staticmethod
+    def row_payloads(rows, fields: List[str]) -> List[Dict[str, Any]]:
+        """The to_dict() output of plain product rows, limited to fields."""
+        def price(value):
+            return float(value) if value else None
+        
+        def timestamp(value):
+            return value.isoformat() if value else None
+        
+        convert = {'price': price, 'created_at': timestamp, 'updated_at': timestamp}
+        plain = [f for f in fields if f not in convert]
+        converted = [(f, convert[f]) for f in fields if f in convert]
+        
+        payloads = []
+        for row in rows:
+            payload = {f: getattr(row, f) for f in plain}
+            for f, to_json in converted:
+                payload[f] = to_json(getattr(row, f))
+            payloads.append(payload)
+        return payloads
+    
+    @staticmethod
+    def search_document():
+        """
+        Text searched by search_products. Spelled out as SQL so it matches the
+        ix_products_search index expression exactly; bound parameters would add
+        casts that keep the planner from using the index.
+        """
+        return literal_column(
+            "to_tsvector('english', coalesce(products.name, '') || ' ' || coalesce(products.description, ''))"
+        )
+    
+    @staticmethod
+    def search_products(
+        q: str,
+        active: Optional[bool] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count: str = 'exact'
+    ) -> Dict[str, Any]:
+        """
+        Ranked search over name and description, best match first.
+        
+        On PostgreSQL a product matches when its full-text document matches
+        websearch_to_tsquery(q) (word stems, quoted phrases, -exclusions) or
+        its name contains q, served by the ix_products_search and
+        ix_products_name_trgm GIN indexes. Results are ranked by ts_rank_cd
+        and then by trigram similarity of the name. Elsewhere (SQLite in
+        testing) every word of q must appear in the name or description, and
+        products whose name contains the whole of q come first.
+        """
+        if count not in ProductService.COUNT_MODES:
+            raise ValueError(f"Invalid count mode '{count}'. Use exact, estimate or none")
+        
+        q = (q or '').strip()
+        if not q:
+            raise ValueError('Search query q is required')
+        
+        query = db.session.query(Product).filter(*ProductService.build_filters(active=active))
+        
+        if DatabaseHelper.supports_copy():
+            ts_query = func.websearch_to_tsquery('english', q)
+            document = ProductService.search_document()
+            query = query.filter(or_(document.op('@@')(ts_query), Product.name.ilike(f'%{q}%')))
+            ranking = [
+                func.ts_rank_cd(document, ts_query).desc(),
+                func.similarity(Product.name, q).desc()
+            ]
+        else:
+            for term in q.split():
+                query = query.filter(or_(Product.name.ilike(f'%{term}%'), Product.description.ilike(f'%{term}%')))
+            ranking = [case((Product.name.ilike(f'%{q}%'), 0), else_=1)]
+        
+        total, total_exact = ProductService.count_products(query, count, ['search', q, active])
+        products = query.order_by(*ranking, Product.id).limit(limit).offset(offset).all()
         
         return {
             'products': [p.to_dict() for p in products],
             'total': total,
+            'total_exact': total_exact,
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'q': q
         }
     
+    @staticmethod
+    def suggest_skus(prefix: str, limit: int = 10) -> List[str]:
+        """
+        Up to limit SKUs starting with prefix (case-insensitive), in order.
+        
+        On PostgreSQL the LIKE prefix match and the ~<~ ordering are both
+        served by the ix_products_sku_lower_pattern index, so only limit index
+        entries are read. Results are kept in an in-process LRU keyed by the
+        listing generation in Redis, which every product write advances, so
+        writes handled by other workers are seen too; without Redis nothing
+        is cached.
+        """
+        prefix = (prefix or '').strip().lower()
+        if not prefix:
+            raise ValueError('SKU prefix is required')
+        limit = max(1, min(limit, ProductService.SUGGEST_LIMIT_MAX))
+        
+        generation = ProductService.listing_generation()
+        cache_key = (generation, prefix, limit)
+        if generation is not None:
+            cached = ProductService._suggest_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        pattern = ProductService.prefix_pattern(prefix)
+        sku_key = func.lower(Product.sku)
+        if DatabaseHelper.supports_copy():
+            # Byte order, the order of the text_pattern_ops index
+            ordering = literal_column('LOWER(products.sku) USING ~<~')
+        else:
+            ordering = sku_key
+        
+        rows = db.session.query(Product.sku).filter(
+            sku_key.like(pattern, escape='\\')
+        ).order_by(ordering).limit(limit).all()
+        skus = [row.sku for row in rows]
+        
+        if generation is not None:
+            ProductService._suggest_cache.set(cache_key, skus)
+        return skus
+    
+    @staticmethod
+    def prefix_pattern(prefix: str) -> str:
+        """LIKE pattern matching values that start with prefix, escaping wildcards with a backslash."""
+        return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    
+    @staticmethod
+    def catalog_changed():
+        """Invalidates whole-catalog caches after bulk changes such as imports."""
+        RedisCache.bump('catalog')
+        RedisCache.bump('listing')
+        ProductService._suggest_cache.clear()
+        ProductService._product_cache.clear()
+    
+    @staticmethod
+    def count_products(query, mode: str, filter_values: list) -> tuple:
+        """
+        Returns (total, exact) for a filtered product query.
+        
+        'exact' runs COUNT(*), 'none' skips counting (total is None) and
+        'estimate' asks the PostgreSQL planner, falling back to an exact count
+        for small results and on other databases. Totals are cached in Redis
+        for PRODUCT_COUNT_CACHE_TTL seconds per mode and filter set under the
+        current listing generation, so a write never leaves an old total in
+        a list served under the new generation's ETag.
+        """
+        if mode == 'none':
+            return None, False
+        
+        digest = hashlib.sha1(json.dumps([mode] + filter_values).encode('utf-8')).hexdigest()
+        cache_key = f"products:count:{ProductService.listing_generation()}:{digest}"
+        cached = RedisCache.get(cache_key)
+        if cached is not None:
+            return cached['total'], cached['exact']
+        
+        total, exact = None, True
+        if mode == 'estimate':
+            total = DatabaseHelper.estimate_count(query.statement)
+            exact = False
+            if total is not None and total < ProductService.ESTIMATE_EXACT_BELOW:
+                total = None
+        if total is None:
+            total, exact = query.count(), True
+        
+        RedisCache.set(cache_key, {'total': total, 'exact': exact}, current_app.config['PRODUCT_COUNT_CACHE_TTL'])
+        return total, exact
+    
+    @staticmethod
+    def encode_cursor(product: Product) -> str:
+        """Opaque page token holding the (created_at, id) of the last row served."""
+        payload = json.dumps([product.created_at.isoformat(), product.id])
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, product_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return datetime.fromisoformat(created_at), int(product_id)
+        except (ValueError, TypeError, UnicodeEncodeError):
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def export_products(export_format: str, filters: list, chunk_rows: int = 1000) -> Iterator[str]:
+        """
+        Yields the matching products as CSV or NDJSON text, chunk_rows rows per
+        chunk, in id order. Only the exported columns are selected, no ORM
+        objects are built, and rows are fetched through a server-side cursor
+        (stream_results) in batches of chunk_rows, so memory stays flat however
+        large the catalog is. NDJSON rows have the same shape as to_dict().
+        """
+        columns = [getattr(Product, column) for column in ProductService.PRODUCT_FIELDS]
+        stmt = select(*columns).where(*filters).order_by(Product.id)
+        
+        result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_rows))
+        try:
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(ProductService.PRODUCT_FIELDS)
+                for rows in result.partitions():
+                    for row in rows:
+                        writer.writerow([
+                            row.id, row.sku, row.name, row.description or '', row.price,
+                            'true' if row.active else 'false',
+                            row.created_at.isoformat() if row.created_at else '',
+                            row.updated_at.isoformat() if row.updated_at else ''
+                        ])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                for rows in result.partitions():
+                    yield ''.join(
+                        json.dumps({
+                            'id': row.id,
+                            'sku': row.sku,
+                            'name': row.name,
+                            'description': row.description,
+                            'price': float(row.price) if row.price else None,
+                            'active': row.active,
+                            'created_at': row.created_at.isoformat() if row.created_at else None,
+                            'updated_at': row.updated_at.isoformat() if row.updated_at else None
+                        }) + '\n'
+                        for row in rows
+                    )
+        finally:
+            result.close()
+    
     @staticmethod
     def get_product_by_id(product_id: int) -> Optional[Product]:
         return db.session.query(Product).filter_by(id=product_id).first()
     
+    @staticmethod
+    def get_product_payload(product_id: int) -> Optional[Dict[str, Any]]:
+        """to_dict() of a product by id, read through the product cache."""
+        return ProductService._cached_product(
+            f"products:id:{product_id}",
+            lambda: ProductService.get_product_by_id(product_id)
+        )
+    
+    @staticmethod
+    def get_product_payload_by_sku(sku: str) -> Optional[Dict[str, Any]]:
+        """to_dict() of a product by case-insensitive SKU, read through the product cache."""
+        return ProductService._cached_product(
+            f"products:sku:{sku.lower()}",
+            lambda: DatabaseHelper.get_product_by_sku(sku)
+        )
+    
+    @staticmethod
+    def _cached_product(key: str, load) -> Optional[Dict[str, Any]]:
+        """
+        Read-through lookup: the per-process LRU, then Redis, then load().
+        
+        Redis entries carry the catalog generation and the key's own version
+        read before the product was loaded, and are ignored once either has
+        advanced: catalog_changed() for bulk changes, invalidate_product() for
+        single-product writes. A lookup that loaded the row just before a
+        write and stores it just after the invalidation therefore leaves an
+        entry nobody reads. Entries live PRODUCT_CACHE_TTL seconds in Redis
+        and a few seconds locally. Missing products are not cached, and
+        without Redis every lookup goes to the database.
+        """
+        payload = ProductService._product_cache.get(key)
+        if payload is not None:
+            return payload
+        
+        # Generation, version and entry in one round trip
+        values = RedisCache.get_many(RedisCache.generation_key('catalog'), RedisCache.generation_key(key), key)
+        if values is None:
+            product = load()
+            return product.to_dict() if product else None
+        
+        generation, version, entry = values[0] or 0, values[1] or 0, values[2]
+        if entry and entry.get('generation') == generation and entry.get('version') == version:
+            payload = entry['product']
+        else:
+            product = load()
+            if not product:
+                return None
+            payload = product.to_dict()
+            RedisCache.set(
+                key, {'generation': generation, 'version': version, 'product': payload},
+                current_app.config['PRODUCT_CACHE_TTL']
+            )
+        
+        ProductService._product_cache.set(key, payload)
+        return payload
+    
+    @staticmethod
+    def invalidate_product(product_id: int, *skus: str):
+        """Invalidates the cached payloads of one product under its id and SKUs."""
+        ProductService.invalidate_products([product_id], skus)
+    
+    @staticmethod
+    def invalidate_products(product_ids, skus):
+        """
+        Invalidates the cached payloads of several products by advancing the
+        version of each key in one Redis call. Versions outlive every entry
+        stored under an older one, so one expiring cannot revive a stale entry.
+        """
+        keys = [f"products:id:{product_id}" for product_id in product_ids if product_id is not None]
+        keys += [f"products:sku:{sku.lower()}" for sku in skus if sku]
+        RedisCache.bump(*keys, ttl=2 * current_app.config['PRODUCT_CACHE_TTL'])
+        ProductService._product_cache.delete(*keys)
+        RedisCache.bump('listing')
+    
+    @staticmethod
+    def listing_generation() -> Optional[int]:
+        """
+        Counter advanced by every product write (single writes, import
+        batches, bulk changes), so product lists can be revalidated without
+        querying. None when Redis is unavailable.
+        """
+        return RedisCache.generation('listing')
+    
     @staticmethod
     def create_product(data: Dict[str, Any]) -> Product:
         product = Product.from_dict(data)
         db.session.add(product)
         db.session.commit()
+        ProductService.invalidate_product(product.id, product.sku)
+        ProductService._suggest_cache.clear()
         return product
     
     @staticmethod
@@ -56,8 +505,12 @@ class ProductService:
         if not product:
             return None
         
+        old_sku = product.sku
         product.update_from_dict(data)
         db.session.commit()
+        ProductService.invalidate_product(product_id, old_sku, product.sku)
+        if 'sku' in data:
+            ProductService._suggest_cache.clear()
         return product
     
     @staticmethod
@@ -66,8 +519,11 @@ class ProductService:
         if not product:
             return False
         
+        sku = product.sku
         db.session.delete(product)
         db.session.commit()
+        ProductService.invalidate_product(product_id, sku)
+        ProductService._suggest_cache.clear()
         return True
     
     @staticmethod
@@ -75,4 +531,201 @@ class ProductService:
         count = db.session.query(Product).count()
         db.session.query(Product).delete()
         db.session.commit()
+        ProductService.catalog_changed()
         return count
+    
+    @staticmethod
+    def apply_batch(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Applies many product writes in one transaction.
+        
+        Each operation is {"op": "upsert", "sku", "name", "price", ...},
+        {"op": "patch", "sku" or "id", <some of name/description/price/active>}
+        or {"op": "delete", "sku" or "id"}. SKUs match case-insensitively.
+        Products are resolved with one query and written with one statement
+        per kind: an upsert through DatabaseHelper, a bulk UPDATE by primary
+        key and a DELETE ... IN. Then everything is committed together.
+        
+        Returns a result per operation, in order: {index, status[, id][, error]}
+        where status is inserted, updated, unchanged, patched, deleted,
+        not_found or invalid. Invalid operations and missing products do not
+        stop the others. A database error rolls the whole batch back.
+        """
+        results = [None] * len(operations)
+        valid = []
+        for index, operation in enumerate(operations):
+            error = ProductService._check_operation(operation)
+            if error:
+                results[index] = {'index': index, 'status': 'invalid', 'error': error}
+            else:
+                valid.append((index, operation))
+        
+        targets = [ProductService._operation_target(operation) for _, operation in valid]
+        skus = [value for kind, value in targets if kind == 'sku']
+        ids = [value for kind, value in targets if kind == 'id']
+        by_sku, by_id = {}, {}
+        if targets:
+            rows = db.session.query(
+                Product.id, Product.sku, Product.name, Product.description, Product.price, Product.active
+            ).filter(or_(func.lower(Product.sku).in_(skus), Product.id.in_(ids))).all()
+            by_sku = {row.sku.lower(): row for row in rows}
+            by_id = {row.id: row for row in rows}
+        
+        def existing(operation):
+            kind, value = ProductService._operation_target(operation)
+            return by_sku.get(value) if kind == 'sku' else by_id.get(value)
+        
+        # Duplicates are found by resolved product, so a SKU and an id naming the same row collide
+        upserts, patches, deletes = [], [], []
+        seen = set()
+        for index, operation in valid:
+            row = existing(operation)
+            key = ('id', row.id) if row is not None else ProductService._operation_target(operation)
+            if key in seen:
+                error = 'Product is already targeted by an earlier operation in this batch'
+                results[index] = {'index': index, 'status': 'invalid', 'error': error}
+                continue
+            seen.add(key)
+            {'upsert': upserts, 'patch': patches, 'delete': deletes}[operation['op']].append((index, operation))
+        
+        touched_ids, touched_skus = [], []
+        try:
+            prepared = []
+            for index, operation in upserts:
+                data = DatabaseHelper._prepare_product_data(operation)
+                prepared.append(data)
+                row = existing(operation)
+                if row is None:
+                    status = 'inserted'
+                elif ProductService._differs(row, data):
+                    status = 'updated'
+                else:
+                    status = 'unchanged'
+                results[index] = {'index': index, 'status': status, 'id': row.id if row else None}
+                touched_skus.append(data['sku'])
+            if prepared:
+                DatabaseHelper._execute_upsert_batch(prepared, commit=False)
+            
+            now = datetime.utcnow()
+            changes = []
+            for index, operation in patches:
+                row = existing(operation)
+                if row is None:
+                    results[index] = {'index': index, 'status': 'not_found'}
+                    continue
+                values = {field: operation[field] for field in ProductService.PATCH_FIELDS if field in operation}
+                if ProductService._differs(row, values):
+                    changes.append({'id': row.id, **values, 'updated_at': now})
+                    status = 'patched'
+                else:
+                    status = 'unchanged'
+                results[index] = {'index': index, 'status': status, 'id': row.id}
+                touched_ids.append(row.id)
+                touched_skus.append(row.sku)
+            if changes:
+                # ORM bulk UPDATE by primary key: one executemany per set of patched fields
+                db.session.execute(update(Product), changes)
+            
+            deleted_ids = []
+            for index, operation in deletes:
+                row = existing(operation)
+                if row is None:
+                    results[index] = {'index': index, 'status': 'not_found'}
+                    continue
+                deleted_ids.append(row.id)
+                results[index] = {'index': index, 'status': 'deleted', 'id': row.id}
+                touched_ids.append(row.id)
+                touched_skus.append(row.sku)
+            if deleted_ids:
+                db.session.execute(
+                    delete(Product).where(Product.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+                )
+            
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        inserted = [r for r in results if r['status'] == 'inserted']
+        if inserted:
+            new_ids = dict(db.session.query(func.lower(Product.sku), Product.id).filter(
+                func.lower(Product.sku).in_([op['sku'].strip().lower() for _, op in upserts])
+            ).all())
+            for index, operation in upserts:
+                if results[index]['status'] == 'inserted':
+                    results[index]['id'] = new_ids.get(operation['sku'].strip().lower())
+        
+        if touched_ids or touched_skus:
+            ProductService.invalidate_products(touched_ids, touched_skus)
+            ProductService._suggest_cache.clear()
+        
+        return {
+            'results': results,
+            'summary': dict(Counter(r['status'] for r in results))
+        }
+    
+    @staticmethod
+    def _operation_target(operation: Dict[str, Any]) -> tuple:
+        if operation.get('sku') is not None:
+            return 'sku', operation['sku'].strip().lower()
+        return 'id', operation['id']
+    
+    @staticmethod
+    def _differs(row, values: Dict[str, Any]) -> bool:
+        for field in ProductService.PATCH_FIELDS:
+            if field not in values:
+                continue
+            current, new = getattr(row, field), values[field]
+            if field == 'price':
+                current, new = float(current), round(float(new), 2)
+            if current != new:
+                return True
+        return False
+    
+    @staticmethod
+    def _check_operation(operation) -> Optional[str]:
+        """Returns why a batch operation is malformed, or None."""
+        if not isinstance(operation, dict):
+            return 'Operation must be an object'
+        
+        op = operation.get('op')
+        if op not in ProductService.BATCH_OPERATIONS:
+            return f"Unknown op '{op}'. Use upsert, patch or delete"
+        
+        sku = operation.get('sku')
+        if sku is not None and (not isinstance(sku, str) or not sku.strip() or len(sku.strip()) > 255):
+            return 'sku must be a non-empty string of at most 255 characters'
+        
+        if op == 'upsert':
+            for field in ('sku', 'name', 'price'):
+                if operation.get(field) is None:
+                    return f'Missing required field: {field}'
+        else:
+            if (sku is None) == (operation.get('id') is None):
+                return 'Give exactly one of sku or id'
+            product_id = operation.get('id')
+            if product_id is not None and (not isinstance(product_id, int) or isinstance(product_id, bool)):
+                return 'id must be an integer'
+        
+        if op == 'patch':
+            unknown = set(operation) - {'op', 'sku', 'id'} - set(ProductService.PATCH_FIELDS)
+            if unknown:
+                return f"Cannot patch field(s): {', '.join(sorted(unknown))}"
+            if not any(field in operation for field in ProductService.PATCH_FIELDS):
+                return 'Nothing to patch'
+        
+        name = operation.get('name')
+        if 'name' in operation and (not isinstance(name, str) or not name.strip() or len(name.strip()) > 500):
+            return 'name must be a non-empty string of at most 500 characters'
+        
+        price = operation.get('price')
+        if 'price' in operation and (not isinstance(price, (int, float)) or isinstance(price, bool) or price < 0):
+            return 'price must be a non-negative number'
+        
+        if 'description' in operation and not isinstance(operation['description'], (str, type(None))):
+            return 'description must be a string'
+        
+        if 'active' in operation and not isinstance(operation['active'], bool):
+            return 'active must be a boolean'
+        
+        return None
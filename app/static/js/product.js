@@ -2,6 +2,8 @@ class ProductManager {
     constructor() {
         this.currentPage = 0;
         this.limit = 20;
+        // cursors[i] is the keyset cursor that loads page i ('' for the first page)
+        this.cursors = [''];
         this.filters = {};
         this.editingProductId = null;
 
@@ -14,12 +16,40 @@ class ProductManager {
             e.preventDefault();
             this.saveProduct();
         });
+
+        document.getElementById('filterSku').addEventListener('input', (e) => {
+            clearTimeout(this.suggestTimer);
+            this.suggestTimer = setTimeout(() => this.suggestSkus(e.target.value.trim()), 150);
+        });
+    }
+
+    async suggestSkus(prefix) {
+        const list = document.getElementById('skuSuggestions');
+
+        if (!prefix) {
+            list.innerHTML = '';
+            return;
+        }
+
+        try {
+            const response = await fetch(`/api/products/sku-suggest?${new URLSearchParams({ prefix, limit: 10 })}`);
+            const data = await response.json();
+
+            list.replaceChildren(...(data.skus || []).map(sku => {
+                const option = document.createElement('option');
+                option.value = sku;
+                return option;
+            }));
+        } catch (error) {
+            console.error('Error loading SKU suggestions:', error);
+        }
     }
 
     async loadProducts() {
         const params = new URLSearchParams({
             limit: this.limit,
-            offset: this.currentPage * this.limit,
+            cursor: this.cursors[this.currentPage],
+            count: 'estimate',
             ...this.filters
         });
 
@@ -27,6 +57,7 @@ class ProductManager {
             const response = await fetch(`/api/products?${params}`);
             const data = await response.json();
 
+            this.cursors[this.currentPage + 1] = data.next_cursor;
             this.renderProducts(data.products);
             this.updatePagination(data);
         } catch (error) {
@@ -66,12 +97,13 @@ class ProductManager {
     updatePagination(data) {
         const info = document.getElementById('paginationInfo');
         const start = this.currentPage * this.limit + 1;
-        const end = Math.min(start + data.products.length - 1, data.total);
+        const end = start + data.products.length - 1;
+        const total = data.total_exact ? data.total : `about ${data.total}`;
 
-        info.textContent = `Showing ${start}-${end} of ${data.total} products`;
+        info.textContent = `Showing ${start}-${end} of ${total} products`;
 
         document.getElementById('prevButton').disabled = this.currentPage === 0;
-        document.getElementById('nextButton').disabled = (this.currentPage + 1) * this.limit >= data.total;
+        document.getElementById('nextButton').disabled = !data.next_cursor;
     }
 
     applyFilters() {
@@ -86,6 +118,7 @@ class ProductManager {
         if (active) this.filters.active = active;
 
         this.currentPage = 0;
+        this.cursors = [''];
         this.loadProducts();
     }
 
@@ -97,6 +130,7 @@ class ProductManager {
     }
 
     nextPage() {
+        if (!this.cursors[this.currentPage + 1]) return;
         this.currentPage++;
         this.loadProducts();
     }
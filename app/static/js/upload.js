@@ -33,8 +33,11 @@ class UploadManager {
             return;
         }
 
-        if (!file.name.endsWith('.csv')) {
-            this.showError('Please select a valid CSV file');
+        const name = file.name.toLowerCase();
+        const extensions = ['.csv', '.csv.gz', '.csv.zst', '.zip', '.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz',
+            '.ndjson.zst', '.jsonl.zst', '.parquet', '.arrow', '.feather', '.ipc'];
+        if (!extensions.some(extension => name.endsWith(extension))) {
+            this.showError('Please select a CSV, NDJSON, Parquet or Arrow file');
             this.fileInput.value = '';
             this.uploadButton.disabled = true;
             return;
@@ -1,5 +1,6 @@
 from app.tasks.csv_import import process_csv_import
+from app.tasks.parallel_import import process_csv_chunk, finalize_parallel_import, fail_parallel_import
 from app.tasks.bulk_delete import bulk_delete_products
 from app.tasks.webhook_delivery import test_webhook_delivery, deliver_webhook
 
-__all__ = ['process_csv_import', 'bulk_delete_products', 'test_webhook_delivery', 'deliver_webhook']
+__all__ = ['process_csv_import', 'process_csv_chunk', 'finalize_parallel_import', 'fail_parallel_import', 'bulk_delete_products', 'test_webhook_delivery', 'deliver_webhook']
@@ -1,44 +1,57 @@
-from celery import current_task
-from app.extensions import celery, db
-from app.models.product import Product
+from flask import current_app
+from app.extensions import celery
+from app.utils.db_helper import DatabaseHelper
 from app.utils.progress_tracker import ProgressTracker
 from app.services.import_service import ImportService
+from app.services.product_service import ProductService
 
 @celery.task(bind=True)
-def bulk_delete_products(self, job_id: str):
+def bulk_delete_products(self, job_id: str, filters: dict = None):
+    """
+    Deletes all products, or those matching filters (see
+    ProductService.build_delete_filters). Deleting everything on PostgreSQL
+    is a single TRUNCATE. Otherwise matching rows are removed in id ranges
+    of BULK_DELETE_RANGE_SIZE products found by keyset (see
+    DatabaseHelper.next_product_range), one DELETE ... WHERE id BETWEEN
+    statement and commit per range, so no rows are loaded and locks stay
+    short. Caches are invalidated after every committed range, so readers
+    never see products that are already gone for the rest of the run.
+    """
     tracker = ProgressTracker()
     
     try:
         tracker.publish_progress(job_id, 'STARTED', 0, 'Starting bulk delete')
         ImportService.update_job_status(job_id, 'STARTED')
         
-        total_count = db.session.query(Product).count()
+        clauses = ProductService.build_delete_filters(filters)
+        total_count = DatabaseHelper.count_matching_products(clauses)
         tracker.publish_progress(job_id, 'PROGRESS', 10, f'Found {total_count} products to delete', total=total_count)
         ImportService.update_job_status(job_id, 'PROGRESS', total_rows=total_count)
         
-        batch_size = 1000
         deleted = 0
-        
-        while True:
-            products = db.session.query(Product).limit(batch_size).all()
-            
-            if not products:
-                break
-            
-            for product in products:
-                db.session.delete(product)
-            
-            db.session.commit()
-            deleted += len(products)
-            
-            progress = int((deleted / total_count) * 100) if total_count > 0 else 100
-            tracker.publish_progress(
-                job_id, 'PROGRESS', progress,
-                f'Deleted {deleted} of {total_count} products',
-                deleted=deleted,
-                total=total_count
-            )
-            ImportService.update_job_status(job_id, 'PROGRESS', processed_rows=deleted)
+        if not clauses and DatabaseHelper.supports_copy():
+            DatabaseHelper.truncate_products()
+            ProductService.catalog_changed()
+            deleted = total_count
+        elif total_count:
+            range_size = current_app.config['BULK_DELETE_RANGE_SIZE']
+            last_id = 0
+            while True:
+                id_range = DatabaseHelper.next_product_range(last_id, range_size, clauses)
+                if id_range is None:
+                    break
+                first_id, last_id = id_range
+                deleted += DatabaseHelper.delete_product_range(first_id, last_id, clauses)
+                ProductService.catalog_changed()
+                
+                progress = min(int(deleted / total_count * 100), 99)
+                tracker.publish_progress(
+                    job_id, 'PROGRESS', progress,
+                    f'Deleted {deleted} of {total_count} products',
+                    deleted=deleted,
+                    total=total_count
+                )
+                ImportService.update_job_status(job_id, 'PROGRESS', processed_rows=deleted)
         
         tracker.publish_progress(job_id, 'SUCCESS', 100, f'Deleted {deleted} products', deleted=deleted)
         ImportService.update_job_status(
@@ -1,65 +1,67 @@
+import logging
 import os
-import csv
-import chardet
+import time
 from celery import current_task
 from celery.exceptions import MaxRetriesExceededError
+from flask import current_app
 from app.extensions import celery, db
 from app.services.import_service import ImportService
 from app.utils.db_helper import DatabaseHelper
 from app.utils.progress_tracker import ProgressTracker
 from app.utils.csv_validator import CSVValidator
+from app.utils.import_reader import ImportReader
+from app.utils.import_metrics import ImportMetrics
 
-def detect_encoding(filepath: str) -> str:
-    with open(filepath, 'rb') as f:
-        raw_data = f.read(10000)
-        result = chardet.detect(raw_data)
-        return result['encoding'] or 'utf-8'
+logger = logging.getLogger(__name__)
 
 @celery.task(bind=True, max_retries=3, default_retry_delay=60)
-def process_csv_import(self, job_id: str, filepath: str):
+def process_csv_import(self, job_id: str, filepath: str, options: dict = None):
     tracker = ProgressTracker()
+    options = options or {}
+    engine = options.get('engine') or current_app.config['IMPORT_ENGINE']
+    columnar = options.get('columnar', current_app.config['IMPORT_COLUMNAR'])
+    pipeline = options.get('pipeline', current_app.config['IMPORT_PIPELINE'])
+    queue_depth = options.get('queue_depth') or current_app.config['IMPORT_QUEUE_DEPTH']
+    dedupe = options.get('dedupe', current_app.config['IMPORT_DEDUPE'])
+    follow = options.get('stream', False)
+    replace = options.get('replace', False)
+    dry_run = options.get('dry_run', False)
+    file_format = options.get('format')
     
     try:
         tracker.publish_progress(job_id, 'STARTED', 0, 'Starting CSV import')
         ImportService.update_job_status(job_id, 'STARTED')
         
-        total_rows = count_csv_rows(filepath)
-        tracker.publish_progress(job_id, 'PROGRESS', 0, f'Found {total_rows} rows', total_rows=total_rows)
-        ImportService.update_job_status(job_id, 'PROGRESS', total_rows=total_rows)
-        
-        tracker.publish_progress(job_id, 'PROGRESS', 5, 'Parsing CSV')
+        if options.get('parallel') and not (follow or replace or dry_run):
+            if DatabaseHelper.supports_copy():
+                from app.tasks.parallel_import import dispatch_parallel_import
+                chunks = options.get('chunks') or current_app.config['IMPORT_PARALLEL_CHUNKS']
+                dispatched = dispatch_parallel_import(
+                    job_id, filepath, chunks, tracker, columnar=columnar, file_format=file_format
+                )
+                if dispatched:
+                    return {
+                        'status': 'DISPATCHED',
+                        'job_id': job_id,
+                        'chunks': dispatched
+                    }
+            logger.info("Parallel import unavailable for %s, importing sequentially", filepath)
         
-        result = process_csv_file(filepath, job_id, total_rows, tracker)
+        job = ImportService.get_job(job_id)
+        resume_from = job.checkpoint if job else None
+        if resume_from:
+            tracker.publish_progress(job_id, 'PROGRESS', 0, f"Resuming after row {resume_from['row']}")
+        else:
+            tracker.publish_progress(job_id, 'PROGRESS', 0, 'Parsing CSV')
         
-        tracker.publish_progress(job_id, 'SUCCESS', 100, 'Import Complete', **result)
-        ImportService.update_job_status(
-            job_id,
-            'SUCCESS',
-            processed_rows=result['processed'],
-            success_count=result['success'],
-            error_count=result['errors']
+        result = process_csv_file(
+            filepath, job_id, tracker,
+            engine=engine, columnar=columnar, pipeline=pipeline, queue_depth=queue_depth,
+            resume_from=resume_from, dedupe=dedupe, follow=follow, file_format=file_format,
+            replace=replace, dry_run=dry_run
         )
         
-        # Trigger webhooks for upload.completed
-        from app.services.webhook_service import WebhookService
-        from app.models.import_job import ImportJob
-        from datetime import datetime
-        
-        job = db.session.query(ImportJob).filter_by(id=job_id).first()
-        if job:
-            webhook_payload = {
-                'event': 'upload.completed',
-                'upload_id': job_id,
-                'filename': job.filename,
-                'status': 'completed',
-                'imported_count': result['success'],
-                'total_rows': result['processed'],
-                'error_count': result['errors'],
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            WebhookService.trigger_webhooks('upload.completed', webhook_payload)
-        
-        cleanup_file(filepath)
+        complete_import(job_id, filepath, result, tracker)
         
         return {
             'status': 'SUCCESS',
@@ -73,116 +75,469 @@ def process_csv_import(self, job_id: str, filepath: str):
         try:
             self.retry(exc=e)
         except MaxRetriesExceededError:
-            tracker.publish_progress(job_id, 'FAILURE', 0, f'Failed: {error_message}')
-            ImportService.update_job_status(job_id, 'FAILURE', error_message=error_message)
-            
-            # Trigger webhooks for upload.failed
-            from app.services.webhook_service import WebhookService
-            from app.models.import_job import ImportJob
-            from datetime import datetime
-            
-            job = db.session.query(ImportJob).filter_by(id=job_id).first()
-            if job:
-                webhook_payload = {
-                    'event': 'upload.failed',
-                    'upload_id': job_id,
-                    'filename': job.filename,
-                    'status': 'failed',
-                    'error_message': error_message,
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-                WebhookService.trigger_webhooks('upload.failed', webhook_payload)
-            
-            cleanup_file(filepath)
+            fail_import(job_id, filepath, error_message, tracker)
             raise
 
-def count_csv_rows(filepath: str) -> int:
-    encoding = detect_encoding(filepath)
-    with open(filepath, 'r', encoding=encoding, errors='replace') as f:
-        return sum(1 for _ in csv.DictReader(f))
+def complete_import(job_id: str, filepath: str, result: dict, tracker: ProgressTracker):
+    """Marks the job successful, triggers upload.completed webhooks and removes the upload."""
+    tracker.publish_progress(job_id, 'SUCCESS', 100, 'Import Complete', total_rows=result['processed'], **result)
+    ImportService.update_job_status(
+        job_id,
+        'SUCCESS',
+        total_rows=result['processed'],
+        processed_rows=result['processed'],
+        success_count=result['success'],
+        error_count=result['errors'],
+        inserted_count=result.get('inserted', 0),
+        updated_count=result.get('updated', 0),
+        unchanged_count=result.get('unchanged', 0),
+        duplicate_count=result.get('duplicates', 0),
+        deleted_count=result.get('deleted', 0),
+        metrics=result.get('metrics'),
+        preview=result.get('preview'),
+        checkpoint=None
+    )
+    
+    # A dry run only reports what the import would change
+    if 'preview' not in result:
+        from app.services.product_service import ProductService
+        ProductService.catalog_changed()
+    
+    # Trigger webhooks for upload.completed
+    from app.services.webhook_service import WebhookService
+    from app.models.import_job import ImportJob
+    from datetime import datetime
+    
+    job = db.session.query(ImportJob).filter_by(id=job_id).first()
+    if job:
+        webhook_payload = {
+            'event': 'upload.completed',
+            'upload_id': job_id,
+            'filename': job.filename,
+            'status': 'completed',
+            'imported_count': result['success'],
+            'total_rows': result['processed'],
+            'error_count': result['errors'],
+            'inserted_count': result.get('inserted', 0),
+            'updated_count': result.get('updated', 0),
+            'unchanged_count': result.get('unchanged', 0),
+            'duplicate_count': result.get('duplicates', 0),
+            'deleted_count': result.get('deleted', 0),
+            'dry_run': 'preview' in result,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        WebhookService.trigger_webhooks('upload.completed', webhook_payload)
+    
+    cleanup_file(filepath)
 
-def process_csv_file(filepath: str, job_id: str, total_rows: int, tracker: ProgressTracker) -> dict:
-    processed = 0
-    success = 0
-    errors = 0
-    batch = []
-    batch_size = 1000
-    
-    encoding = detect_encoding(filepath)
-    print(f"DEBUG: Detected encoding: {encoding} for file {filepath}")
-    print(f"DEBUG: Total rows passed to process_csv_file: {total_rows}")
-    
-    # Read first line to get headers and normalize them
-    with open(filepath, 'r', encoding=encoding, errors='replace') as f:
-        header_line = f.readline()
-        # Handle potential BOM if not handled by encoding
-        if header_line.startswith('\ufeff'):
-            header_line = header_line[1:]
+def fail_import(job_id: str, filepath: str, error_message: str, tracker: ProgressTracker):
+    """
+    Marks the job failed and triggers upload.failed webhooks. The upload is
+    removed unless the job has a checkpoint it can be resumed from.
+    """
+    tracker.publish_progress(job_id, 'FAILURE', 0, f'Failed: {error_message}')
+    ImportService.update_job_status(job_id, 'FAILURE', error_message=error_message)
+    
+    # Batches committed before the failure stay in the catalog
+    from app.services.product_service import ProductService
+    ProductService.catalog_changed()
+    
+    # Trigger webhooks for upload.failed
+    from app.services.webhook_service import WebhookService
+    from app.models.import_job import ImportJob
+    from datetime import datetime
+    
+    job = db.session.query(ImportJob).filter_by(id=job_id).first()
+    if job:
+        webhook_payload = {
+            'event': 'upload.failed',
+            'upload_id': job_id,
+            'filename': job.filename,
+            'status': 'failed',
+            'error_message': error_message,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        WebhookService.trigger_webhooks('upload.failed', webhook_payload)
+    
+    if not (job and job.checkpoint):
+        cleanup_file(filepath)
+
+def process_csv_file(filepath: str, job_id: str, tracker: ProgressTracker, engine: str = 'values',
+                     reader: ImportReader = None, loader=None, on_batch=None, columnar: bool = False,
+                     pipeline: bool = False, queue_depth: int = 4, resume_from: dict = None,
+                     dedupe: bool = False, follow: bool = False, file_format: str = None,
+                     replace: bool = False, dry_run: bool = False, row_offset: int = 0) -> dict:
+    """
+    Validates and writes the rows of one file, or of one byte range when a
+    ranged reader is passed. A loader passed in is owned by the caller and is
+    neither merged nor closed here. on_batch(processed, reader) replaces the
+    default progress publishing after each written batch. row_offset is the
+    number of data rows before the range, so validation errors carry the
+    row number in the whole file.
+    
+    With columnar=True rows are read and validated as pandas DataFrames
+    instead of one by one. With pipeline=True parsing and validation run in a
+    background thread that stays at most queue_depth batches ahead of the
+    database writes. Writes stay on this thread and its session, which the
+    producer never touches, so the session's connection serves the writer
+    alone.
+    
+    Sequential row-by-row imports on the VALUES engine commit every batch, so
+    each one is checkpointed on the job with its end byte offset and running
+    counters. resume_from takes such a checkpoint and continues after it.
+    Other modes only become durable at the end and restart from the top.
+    
+    Stage timings and throughput are collected in an ImportMetrics and
+    returned under 'metrics'.
+    
+    With dedupe=True a pre-pass indexes the whole file first (see SkuIndex)
+    and only the last valid occurrence of each SKU is written; the collapsed
+    rows are reported as duplicates. Ranged readers are not deduplicated,
+    their rows are collapsed by the staged merge instead.
+    
+    With follow=True the file is an UploadSpool still being written to and
+    rows are imported as they arrive (see CSVReader). A dedupe pre-pass has
+    to wait for the whole upload before the first row is written.
+    
+    The reader class comes from file_format, or from the file name when it
+    is not given (see ImportReader); every format shares the validation and
+    write path below.
+    
+    With replace=True the file becomes the whole catalog: rows are always
+    staged, whatever the engine, and applied at the end in one step, which
+    also deletes the products the file does not contain (see
+    CopyLoader.replace and StagingLoader.replace).
+    
+    With dry_run=True rows are validated and staged the same way but nothing
+    is written: the staged rows are compared with products instead (see
+    CopyLoader.diff) and the counts are what the import would have done.
+    The summary and a sample of the changes are returned under 'preview'.
+    """
+    metrics = ImportMetrics()
+    owns_loader = loader is None
+    if owns_loader and (replace or dry_run):
+        if DatabaseHelper.supports_copy():
+            from app.utils.copy_loader import CopyLoader
+            loader = CopyLoader()
+        else:
+            from app.utils.staging_loader import StagingLoader
+            loader = StagingLoader()
+    elif owns_loader and engine == 'copy':
+        if DatabaseHelper.supports_copy():
+            from app.utils.copy_loader import CopyLoader
+            loader = CopyLoader()
+        else:
+            logger.warning("COPY engine unavailable on %s, using VALUES upserts", db.engine.dialect.name)
+    
+    owns_reader = reader is None
+    checkpointing = loader is None and owns_reader and not columnar
+    resume_from = resume_from if checkpointing else None
+    idle_timeout = current_app.config['IMPORT_STREAM_IDLE_TIMEOUT']
+    reader_class = ImportReader.for_file(filepath, file_format)
+    
+    if resume_from:
+        logger.info("Resuming %s after row %d at byte %d", filepath, resume_from['row'], resume_from['offset'])
+        reader = reader_class(
+            filepath,
+            encoding=resume_from['encoding'],
+            headers=resume_from['headers'],
+            start=resume_from['offset'],
+            origin=0,
+            follow=follow,
+            idle_timeout=idle_timeout
+        )
+    
+    sku_index = None
+    if dedupe and owns_reader:
+        from app.utils.sku_index import SkuIndex
+        tracker.publish_progress(job_id, 'PROGRESS', 0, 'Indexing SKUs')
+        started = time.perf_counter()
+        sku_index = SkuIndex.build(
+            reader_class(filepath, follow=follow, idle_timeout=idle_timeout),
+            columnar, current_app.config['IMPORT_FRAME_ROWS']
+        )
+        metrics.add('dedupe', time.perf_counter() - started)
+        logger.info("%d duplicate SKU rows in %s", sku_index.duplicates, filepath)
+    
+    reader = reader or reader_class(filepath, follow=follow, idle_timeout=idle_timeout)
+    on_batch = on_batch or (lambda count, r: publish_batch_progress(job_id, tracker, r, count, metrics))
+    
+    resume_from = resume_from or {}
+    counts = {'processed': resume_from.get('processed', 0), 'errors': resume_from.get('errors', 0)}
+    if columnar:
+        batches = iter_frame_batches(reader, job_id, tracker, counts, current_app.config['IMPORT_FRAME_ROWS'],
+                                     sku_index, metrics, row_offset)
+    else:
+        batches = iter_row_batches(reader, job_id, tracker, counts, sku_index=sku_index, metrics=metrics,
+                                   row_offset=row_offset)
+    
+    import_pipeline = None
+    if pipeline:
+        from app.utils.import_pipeline import ImportPipeline
+        batches = import_pipeline = ImportPipeline(batches, queue_depth, reader=reader)
+    
+    success = resume_from.get('success', 0)
+    inserted = resume_from.get('inserted', 0)
+    updated = resume_from.get('updated', 0)
+    unchanged = resume_from.get('unchanged', 0)
+    deleted = 0
+    preview = None
+    
+    try:
+        for batch, processed, errors, offset in batches:
+            # With a pipeline the producer thread owns the reader; use its capture for this batch
+            progress_reader = import_pipeline.reader if import_pipeline else reader
+            if columnar:
+                batch_result = write_frame(batch, loader, metrics)
+            else:
+                batch_result = write_batch(batch, loader, metrics)
+            success += batch_result['processed']
+            inserted += batch_result['inserted']
+            updated += batch_result['updated']
+            unchanged += batch_result['unchanged']
+            
+            if checkpointing and offset is not None:
+                ImportService.save_checkpoint(job_id, {
+                    'offset': offset,
+                    'row': processed,
+                    'encoding': progress_reader.encoding,
+                    'headers': progress_reader.headers,
+                    'processed': processed,
+                    'errors': errors,
+                    'success': success,
+                    'inserted': inserted,
+                    'updated': updated,
+                    'unchanged': unchanged
+                })
             
-        # Parse headers using csv reader to handle quoting correctly
-        header_reader = csv.reader([header_line])
-        headers = next(header_reader)
-        normalized_headers = [h.strip().lower() for h in headers]
+            metrics.record_rows(processed)
+            on_batch(processed, progress_reader)
         
-    print(f"DEBUG: Normalized headers: {normalized_headers}")
+        if loader and owns_loader and dry_run:
+            tracker.publish_progress(job_id, 'PROGRESS', 99, 'Comparing with the catalog')
+            started = time.perf_counter()
+            preview = loader.diff(replace=replace, sample_size=current_app.config['IMPORT_DRY_RUN_SAMPLE'])
+            metrics.add('diff', time.perf_counter() - started)
+            inserted = preview['inserted']
+            updated = preview['updated']
+            unchanged = preview['unchanged']
+            deleted = preview['deleted']
+        elif loader and owns_loader:
+            if replace:
+                tracker.publish_progress(job_id, 'PROGRESS', 99, 'Replacing the catalog')
+            else:
+                tracker.publish_progress(job_id, 'PROGRESS', 99, 'Merging staged products')
+            started = time.perf_counter()
+            merge_result = loader.replace() if replace else loader.merge()
+            metrics.add('merge', time.perf_counter() - started)
+            inserted = merge_result['inserted']
+            updated = merge_result['updated']
+            unchanged = merge_result['unchanged']
+            deleted = merge_result.get('deleted', 0)
+    finally:
+        if loader and owns_loader:
+            loader.close()
+    
+    result = {
+        'processed': counts['processed'],
+        'success': success,
+        'errors': counts['errors'],
+        'inserted': inserted,
+        'updated': updated,
+        'unchanged': unchanged,
+        'deleted': deleted,
+        'duplicates': sku_index.duplicates if sku_index else 0,
+        'metrics': metrics.to_dict()
+    }
+    if import_pipeline:
+        result['pipeline'] = import_pipeline.stats()
+    if preview:
+        result['preview'] = {
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': unchanged,
+            'deleted': deleted,
+            'rejected': counts['errors'],
+            'sample': preview['sample']
+        }
+    return result
 
-    with open(filepath, 'r', encoding=encoding, errors='replace') as f:
-        # Skip the header line since we already read it
-        # We use DictReader with our normalized headers
-        # But we need to skip the first line of the file
-        f.readline() 
-        
-        reader = csv.DictReader(f, fieldnames=normalized_headers)
+def iter_row_batches(reader: ImportReader, job_id: str, tracker: ProgressTracker, counts: dict, batch_size: int = 1000,
+                     sku_index=None, metrics: ImportMetrics = None, row_offset: int = 0):
+    """
+    Yields (batch of normalized rows, rows read so far, rows rejected so far,
+    byte offset after the batch's last row or None when the encoding does not
+    allow exact offsets). Counting continues from counts, and the first ten
+    rejected rows are published. Error row numbers are shifted by row_offset. Valid rows the sku_index does not keep are
+    dropped. Parse, validate and normalize time go to metrics when given.
+    """
+    batch = []
+    first_row = counts['processed'] + 1
+    exact_offsets = False
+    clock = time.perf_counter
+    timings = {'parse': 0.0, 'validate': 0.0, 'normalize': 0.0}
+    
+    mark = clock()
+    for row_num, row in enumerate(reader, start=first_row):
+        now = clock()
+        timings['parse'] += now - mark
         
-        for row_num, row in enumerate(reader, start=1):
-            if row_num == 1:
-                print(f"DEBUG: First row data: {row}")
+        if row_num == first_row:
+            exact_offsets = reader.exact_offsets
+            timings['parse'] -= reader.detect_seconds
+            if metrics:
+                metrics.add('detect_encoding', reader.detect_seconds)
+            logger.debug("Detected encoding %s for file %s", reader.encoding, reader.filepath)
+            logger.debug("Normalized headers: %s", reader.headers)
+            logger.debug("First row data: %s", row)
 
-            processed += 1
-            
-            is_valid, error_msg = CSVValidator.validate_row(row, row_num)
-            
-            if not is_valid:
-                errors += 1
-                if errors <= 10:
-                    print(f"DEBUG: Validation error: {error_msg}")
-                    tracker.publish_progress(
-                        job_id, 'PROGRESS',
-                        int((processed / total_rows) * 100),
-                        f'Validation error: {error_msg}'
-                    )
-                continue
-            
-            normalized = CSVValidator.normalize_row(row)
-            batch.append(normalized)
-            
-            if len(batch) >= batch_size:
-                batch_result = DatabaseHelper.batch_upsert_products(batch, batch_size)
-                success += batch_result['processed']
-                batch = []
-                
-                progress = int((processed / total_rows) * 100)
+        counts['processed'] += 1
+        
+        is_valid, error_msg = CSVValidator.validate_row(row, row_offset + row_num)
+        mark = clock()
+        timings['validate'] += mark - now
+        
+        if not is_valid:
+            counts['errors'] += 1
+            if counts['errors'] <= 10:
+                logger.debug("Validation error: %s", error_msg)
                 tracker.publish_progress(
-                    job_id, 'PROGRESS', progress,
-                    'Validating' if progress < 50 else 'Importing products',
-                    processed=processed,
-                    total=total_rows
+                    job_id, 'PROGRESS',
+                    int(reader.progress() * 100),
+                    f'Validation error: {error_msg}'
                 )
-                ImportService.update_job_status(job_id, 'PROGRESS', processed_rows=processed)
+            continue
         
-        if batch:
-            batch_result = DatabaseHelper.batch_upsert_products(batch, batch_size)
-            success += batch_result['processed']
+        if sku_index is not None and not sku_index.keeps(row_num - 1):
+            continue
+        
+        batch.append(CSVValidator.normalize_row(row))
+        now = clock()
+        timings['normalize'] += now - mark
+        mark = now
+        
+        if len(batch) >= batch_size:
+            flush_timings(metrics, timings)
+            yield batch, counts['processed'], counts['errors'], reader.bytes_read if exact_offsets else None
+            batch = []
+            mark = clock()
     
-    return {
-        'processed': processed,
-        'success': success,
-        'errors': errors
-    }
+    timings['parse'] += clock() - mark
+    flush_timings(metrics, timings)
+    if batch:
+        yield batch, counts['processed'], counts['errors'], reader.bytes_read if exact_offsets else None
+
+def iter_frame_batches(reader: ImportReader, job_id: str, tracker: ProgressTracker, counts: dict, chunk_size: int,
+                       sku_index=None, metrics: ImportMetrics = None, row_offset: int = 0):
+    """
+    Columnar counterpart of iter_row_batches, yielding normalized DataFrames.
+    pandas reads ahead, so no byte offset is reported. validate_frame also
+    normalizes, so its time is recorded as validate.
+    """
+    clock = time.perf_counter
+    timings = {'parse': 0.0, 'validate': 0.0}
+    first = True
+    
+    mark = clock()
+    for frame in reader.iter_frames(chunk_size):
+        now = clock()
+        timings['parse'] += now - mark
+        
+        if first:
+            first = False
+            timings['parse'] -= reader.detect_seconds
+            if metrics:
+                metrics.add('detect_encoding', reader.detect_seconds)
+            if counts['processed'] == 0:
+                logger.debug("Detected encoding %s for file %s", reader.encoding, reader.filepath)
+                logger.debug("Normalized headers: %s", reader.headers)
+        
+        normalized, frame_errors = CSVValidator.validate_frame(frame, row_offset + counts['processed'] + 1)
+        if sku_index is not None:
+            keep = sku_index.mask(counts['processed'], len(frame))
+            normalized = normalized[keep[frame.index.get_indexer(normalized.index)]]
+        counts['processed'] += len(frame)
+        
+        for error_msg in frame_errors[:max(0, 10 - counts['errors'])]:
+            logger.debug("Validation error: %s", error_msg)
+            tracker.publish_progress(
+                job_id, 'PROGRESS',
+                int(reader.progress() * 100),
+                f'Validation error: {error_msg}'
+            )
+        counts['errors'] += len(frame_errors)
+        
+        timings['validate'] += clock() - now
+        flush_timings(metrics, timings)
+        yield normalized, counts['processed'], counts['errors'], None
+        mark = clock()
+    
+    timings['parse'] += clock() - mark
+    flush_timings(metrics, timings)
+
+def flush_timings(metrics: ImportMetrics, timings: dict):
+    """Moves locally accumulated stage seconds into metrics, keeping per-row overhead off the shared object."""
+    if metrics:
+        for stage, seconds in timings.items():
+            if seconds:
+                metrics.add(stage, seconds)
+    for stage in timings:
+        timings[stage] = 0.0
+
+def publish_batch_progress(job_id: str, tracker: ProgressTracker, reader: ImportReader, processed: int,
+                           metrics: ImportMetrics = None):
+    """
+    Reports progress by bytes consumed. The row total is extrapolated from the
+    bytes-per-row seen so far until the reader reaches the end of the file.
+    With metrics the event also carries the rolling rows/s and an ETA.
+    """
+    fraction = reader.progress()
+    progress = int(fraction * 100)
+    estimated_total = int(processed / fraction) if fraction > 0 else processed
+    
+    throughput = {}
+    if metrics:
+        eta = metrics.eta_seconds(estimated_total)
+        throughput = {
+            'rows_per_second': round(metrics.rows_per_second(), 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        }
+    
+    tracker.publish_progress(
+        job_id, 'PROGRESS', progress,
+        'Validating' if progress < 50 else 'Importing products',
+        processed=processed,
+        total=estimated_total,
+        **throughput
+    )
+    ImportService.update_job_status(job_id, 'PROGRESS', processed_rows=processed, total_rows=estimated_total)
+
+def write_batch(batch: list, loader, metrics: ImportMetrics = None) -> dict:
+    """Sends a validated batch to the COPY staging table or the VALUES upsert path."""
+    if loader:
+        started = time.perf_counter()
+        staged = loader.copy_rows(batch)
+        if metrics:
+            metrics.add('stage', time.perf_counter() - started)
+        return {'processed': staged, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    return DatabaseHelper.batch_upsert_products(batch, metrics=metrics)
+
+def write_frame(frame, loader, metrics: ImportMetrics = None) -> dict:
+    """Columnar counterpart of write_batch for a normalized DataFrame."""
+    if loader:
+        started = time.perf_counter()
+        staged = loader.copy_frame(frame)
+        if metrics:
+            metrics.add('stage', time.perf_counter() - started)
+        return {'processed': staged, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    return DatabaseHelper.batch_upsert_products(frame.to_dict('records'), metrics=metrics)
 
 def cleanup_file(filepath: str):
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-    except Exception:
-        pass
+    from app.utils.spool import UploadSpool
+    
+    for path in [filepath] + UploadSpool.markers(filepath):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass
@@ -0,0 +1,156 @@
+import time
+import redis
+from celery import chord
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.extensions import celery, db
+from app.services.import_service import ImportService
+from app.utils.copy_loader import CopyLoader
+from app.utils.import_reader import ImportReader
+from app.utils.import_metrics import ImportMetrics
+from app.utils.progress_tracker import ProgressTracker
+
+def dispatch_parallel_import(job_id: str, filepath: str, chunks: int, tracker: ProgressTracker,
+                             columnar: bool = False, file_format: str = None) -> int:
+    """
+    Splits the file into row-aligned byte ranges and fans them out as a chord
+    of process_csv_chunk tasks. Every chunk stages its rows in one shared
+    table keyed by byte offset, and finalize_parallel_import merges them, so
+    the last occurrence of a SKU in file order wins regardless of which chunk
+    finishes first. Returns the number of chunks, or 0 when the file cannot
+    be split (e.g. UTF-16, compressed or Parquet input).
+    """
+    reader = ImportReader.for_file(filepath, file_format)(filepath)
+    ranges = reader.split(chunks)
+    if not ranges:
+        return 0
+
+    staging_table = f"import_staging_{job_id.replace('-', '')}"
+    CopyLoader(staging_table, shared=True).close()
+    tracker.clear_counters(job_id)
+
+    tracker.publish_progress(job_id, 'PROGRESS', 0, f'Importing in {len(ranges)} chunks', chunks=len(ranges))
+
+    header = [
+        process_csv_chunk.s(
+            job_id, filepath, index, start, end,
+            reader.encoding, reader.headers, staging_table, reader.file_size, columnar, file_format,
+            reader.range_rows[index]
+        )
+        for index, (start, end) in enumerate(ranges)
+    ]
+    callback = finalize_parallel_import.s(job_id, filepath, staging_table).on_error(
+        fail_parallel_import.s(job_id=job_id, filepath=filepath, staging_table=staging_table)
+    )
+    chord(header)(callback)
+
+    return len(ranges)
+
+@celery.task(bind=True, autoretry_for=(OperationalError, redis.ConnectionError), max_retries=3, default_retry_delay=60)
+def process_csv_chunk(self, job_id: str, filepath: str, chunk_index: int, start: int, end: int,
+                      encoding: str, headers: list, staging_table: str, file_size: int, columnar: bool = False,
+                      file_format: str = None, row_offset: int = 0):
+    from app.tasks.csv_import import process_csv_file
+
+    tracker = ProgressTracker()
+    reader = ImportReader.for_file(filepath, file_format)(filepath, encoding=encoding, headers=headers, start=start, end=end)
+    reported = {'processed': 0, 'bytes': start}
+
+    def on_batch(processed: int, chunk_reader: ImportReader):
+        counters = tracker.increment_counters(
+            job_id,
+            processed=processed - reported['processed'],
+            bytes=chunk_reader.bytes_read - reported['bytes']
+        )
+        reported['processed'] = processed
+        reported['bytes'] = chunk_reader.bytes_read
+
+        progress = min(int(counters.get('bytes', 0) / file_size * 100), 99) if file_size else 99
+        tracker.publish_progress(
+            job_id, 'PROGRESS', progress,
+            'Importing products',
+            processed=counters.get('processed', 0)
+        )
+        ImportService.update_job_status(job_id, 'PROGRESS', processed_rows=counters.get('processed', 0))
+
+    try:
+        # The byte offset orders rows across chunks, so it doubles as the merge sequence
+        loader = CopyLoader(staging_table, shared=True, seq_start=start)
+        try:
+            result = process_csv_file(
+                filepath, job_id, tracker,
+                reader=reader, loader=loader, on_batch=on_batch, columnar=columnar,
+                row_offset=row_offset
+            )
+            loader.commit()
+        finally:
+            loader.close()
+    except Exception:
+        # The chunk's staged rows were rolled back, so its share of the shared
+        # progress counters goes too. Lost database or Redis connections are
+        # retried and count them again; anything else fails the chord at once
+        tracker.increment_counters(
+            job_id,
+            processed=-reported['processed'],
+            bytes=start - reported['bytes']
+        )
+        raise
+
+    return {'chunk': chunk_index, **result}
+
+@celery.task(bind=True)
+def finalize_parallel_import(self, results: list, job_id: str, filepath: str, staging_table: str):
+    from app.tasks.csv_import import complete_import, fail_import
+
+    tracker = ProgressTracker()
+
+    try:
+        tracker.publish_progress(job_id, 'PROGRESS', 99, 'Merging staged products')
+
+        loader = CopyLoader(staging_table, shared=True)
+        try:
+            started = time.perf_counter()
+            merge_result = loader.merge()
+            merge_seconds = time.perf_counter() - started
+            loader.drop()
+        finally:
+            loader.close()
+
+        result = {
+            'processed': sum(r['processed'] for r in results),
+            'success': sum(r['success'] for r in results),
+            'errors': sum(r['errors'] for r in results),
+            'inserted': merge_result['inserted'],
+            'updated': merge_result['updated'],
+            'unchanged': merge_result['unchanged'],
+            'chunks': len(results),
+            'metrics': ImportMetrics.merge([r['metrics'] for r in results])
+        }
+        result['metrics']['stages']['merge'] = round(merge_seconds, 3)
+        complete_import(job_id, filepath, result, tracker)
+        tracker.clear_counters(job_id)
+
+        return {
+            'status': 'SUCCESS',
+            'job_id': job_id,
+            **result
+        }
+    except Exception as e:
+        drop_staging_table(staging_table)
+        fail_import(job_id, filepath, str(e), tracker)
+        raise
+
+@celery.task
+def fail_parallel_import(request, exc, traceback, job_id: str, filepath: str, staging_table: str):
+    """Error callback of the chord, run when a chunk fails after its retries."""
+    from app.tasks.csv_import import fail_import
+
+    drop_staging_table(staging_table)
+    fail_import(job_id, filepath, str(exc), ProgressTracker())
+
+def drop_staging_table(staging_table: str):
+    try:
+        db.session.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
@@ -0,0 +1,382 @@
+import csv
+import io
+import re
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Dict, Any, Iterable
+from app.extensions import db
+
+class CopyLoader:
+    """
+    Bulk load path for PostgreSQL. Rows are streamed into a staging table with
+    COPY FROM STDIN and merged into products with a single set-based upsert.
+
+    The loader holds its own DBAPI connection so that progress commits made on
+    db.session do not end the load transaction.
+    """
+
+    COLUMNS = ['seq', 'sku', 'name', 'description', 'price', 'active']
+    DIFF_FIELDS = ('name', 'description', 'price', 'active')
+
+    def __init__(self, staging_table: str = None, shared: bool = False, seq_start: int = 0):
+        """
+        A shared loader stages into an UNLOGGED table that outlives the
+        connection, so several workers can COPY into it before one of them
+        merges. seq_start offsets the row order key written by this loader.
+        """
+        self.staging_table = staging_table or f"products_staging_{uuid.uuid4().hex[:12]}"
+        self.shared = shared
+        self.seq_start = seq_start
+        self.staged = 0
+        self.connection = db.engine.raw_connection()
+        self._create_staging_table()
+
+    def _create_staging_table(self):
+        if self.shared:
+            prefix, suffix = 'CREATE UNLOGGED TABLE IF NOT EXISTS', ''
+        else:
+            prefix, suffix = 'CREATE TEMP TABLE', 'ON COMMIT DROP'
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"""
+                {prefix} {self.staging_table} (
+                    seq BIGINT NOT NULL,
+                    sku VARCHAR(255) NOT NULL,
+                    name VARCHAR(500) NOT NULL,
+                    description TEXT,
+                    price NUMERIC(10, 2) NOT NULL,
+                    active BOOLEAN NOT NULL
+                ) {suffix}
+            """)
+            if self.shared:
+                self.connection.commit()
+        finally:
+            cursor.close()
+
+    def copy_rows(self, products: Iterable[Dict[str, Any]]) -> int:
+        buffer = io.StringIO()
+        # QUOTE_NONNUMERIC keeps empty descriptions as '' instead of NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+
+        count = 0
+        for product in products:
+            writer.writerow([
+                self.seq_start + self.staged + count,
+                product.get('sku', '').strip(),
+                product.get('name', '').strip(),
+                product.get('description', ''),
+                float(product.get('price', 0)),
+                't' if product.get('active', True) else 'f'
+            ])
+            count += 1
+
+        if count == 0:
+            return 0
+
+        buffer.seek(0)
+        cursor = self.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.staging_table} ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+        self.staged += count
+        return count
+
+    def copy_frame(self, frame) -> int:
+        """Stages a normalized DataFrame (see CSVValidator.validate_frame) without per-row Python work."""
+        import numpy as np
+        import pandas as pd
+
+        count = len(frame)
+        if count == 0:
+            return 0
+
+        start = self.seq_start + self.staged
+        staged = pd.DataFrame({
+            'seq': np.arange(start, start + count, dtype=np.int64),
+            'sku': frame['sku'].to_numpy(),
+            'name': frame['name'].to_numpy(),
+            'description': frame['description'].to_numpy(),
+            'price': frame['price'].astype(float).to_numpy(),
+            'active': np.where(frame['active'].to_numpy(dtype=bool), 't', 'f')
+        })
+
+        buffer = io.StringIO()
+        staged.to_csv(buffer, header=False, index=False, quoting=csv.QUOTE_NONNUMERIC)
+        buffer.seek(0)
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.staging_table} ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+        self.staged += count
+        return count
+
+    def merge(self) -> Dict[str, int]:
+        """
+        Upserts the staged rows into products. When a SKU was staged more than
+        once, the row with the highest seq wins, matching the last-wins dedupe
+        of the VALUES path. Existing rows whose values are identical are left
+        untouched and counted as unchanged.
+        """
+        now = datetime.utcnow()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"""
+                WITH upserted AS (
+                    INSERT INTO products (sku, name, description, price, active, created_at, updated_at)
+                    SELECT DISTINCT ON (LOWER(sku)) sku, name, description, price, active, %(now)s, %(now)s
+                    FROM {self.staging_table}
+                    ORDER BY LOWER(sku), seq DESC
+                    ON CONFLICT (LOWER(sku)) DO UPDATE SET
+                        name = EXCLUDED.name,
+                        description = EXCLUDED.description,
+                        price = EXCLUDED.price,
+                        active = EXCLUDED.active,
+                        updated_at = EXCLUDED.updated_at
+                    WHERE (products.name, products.description, products.price, products.active)
+                        IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.description, EXCLUDED.price, EXCLUDED.active)
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT
+                    COUNT(*) FILTER (WHERE inserted),
+                    COUNT(*) FILTER (WHERE NOT inserted),
+                    (SELECT COUNT(DISTINCT LOWER(sku)) FROM {self.staging_table})
+                FROM upserted
+            """, {'now': now})
+            inserted, updated, distinct = cursor.fetchone()
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+        return {
+            'processed': self.staged,
+            'inserted': inserted or 0,
+            'updated': updated or 0,
+            'unchanged': (distinct or 0) - (inserted or 0) - (updated or 0)
+        }
+
+    def replace(self) -> Dict[str, int]:
+        """
+        Replaces the whole catalog with the staged rows. A shadow copy of
+        products is filled from the staged rows (keeping the id, sku, created_at
+        and, for unchanged rows, updated_at of matching SKUs), indexed and
+        analyzed, then swapped in by renaming within the same transaction.
+        Readers keep using the old table until the commit and then see the
+        new one; there is no per-row conflict handling.
+
+        products is held in SHARE mode while the shadow is built, so writers
+        wait for the swap instead of being lost with the old table.
+        """
+        now = datetime.utcnow()
+        suffix = uuid.uuid4().hex[:12]
+        shadow = f"products_shadow_{suffix}"
+        retired = f"products_old_{suffix}"
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("LOCK TABLE products IN SHARE MODE")
+            cursor.execute("SELECT pg_get_serial_sequence('products', 'id')")
+            sequence = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisprimary
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE i.indrelid = 'products'::regclass
+            """)
+            indexes = cursor.fetchall()
+
+            cursor.execute(f"CREATE TABLE {shadow} (LIKE products INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(f"""
+                INSERT INTO {shadow} (id, sku, name, description, price, active, created_at, updated_at)
+                SELECT
+                    COALESCE(p.id, nextval(%(sequence)s::regclass)),
+                    COALESCE(p.sku, s.sku), s.name, s.description, s.price, s.active,
+                    COALESCE(p.created_at, %(now)s),
+                    CASE WHEN p.id IS NOT NULL
+                        AND (p.name, p.description, p.price, p.active)
+                            IS NOT DISTINCT FROM (s.name, s.description, s.price, s.active)
+                    THEN p.updated_at ELSE %(now)s END
+                FROM (
+                    SELECT DISTINCT ON (LOWER(sku)) sku, name, description, price, active
+                    FROM {self.staging_table}
+                    ORDER BY LOWER(sku), seq DESC
+                ) s
+                LEFT JOIN products p ON LOWER(p.sku) = LOWER(s.sku)
+            """, {'sequence': sequence, 'now': now})
+
+            # Rebuild every index of products (including the migration-only
+            # search indexes) on the filled shadow under temporary names
+            for position, (name, definition, primary) in enumerate(indexes):
+                temporary = f"ix_shadow_{position}_{suffix}"
+                cursor.execute(re.sub(
+                    r'^(CREATE (?:UNIQUE )?INDEX )\S+ ON (?:ONLY )?\S+',
+                    lambda m: f"{m.group(1)}{temporary} ON {shadow}",
+                    definition
+                ))
+                if primary:
+                    cursor.execute(f"ALTER TABLE {shadow} ADD PRIMARY KEY USING INDEX {temporary}")
+            cursor.execute(f"ANALYZE {shadow}")
+
+            cursor.execute(f"""
+                SELECT
+                    COUNT(*) FILTER (WHERE created_at = %(now)s),
+                    COUNT(*) FILTER (WHERE created_at <> %(now)s AND updated_at = %(now)s),
+                    COUNT(*) FILTER (WHERE updated_at <> %(now)s),
+                    (SELECT COUNT(*) FROM products)
+                FROM {shadow}
+            """, {'now': now})
+            inserted, updated, unchanged, existing = cursor.fetchone()
+
+            cursor.execute("LOCK TABLE products IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"ALTER TABLE products RENAME TO {retired}")
+            cursor.execute(f"ALTER TABLE {shadow} RENAME TO products")
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY products.id")
+            for position, (name, definition, primary) in enumerate(indexes):
+                cursor.execute(f'ALTER INDEX "{name}" RENAME TO ix_old_{position}_{suffix}')
+            for position, (name, definition, primary) in enumerate(indexes):
+                cursor.execute(f'ALTER INDEX ix_shadow_{position}_{suffix} RENAME TO "{name}"')
+            cursor.execute(f"DROP TABLE {retired}")
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+        return {
+            'processed': self.staged,
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': unchanged,
+            'deleted': existing - updated - unchanged
+        }
+
+    def diff(self, replace: bool = False, sample_size: int = 20) -> Dict[str, Any]:
+        """
+        Compares the staged rows with products by LOWER(sku) without writing
+        anything. The latest row per SKU is collected into an indexed temp
+        table and joined once against products for the counts, then up to
+        sample_size examples of each change are read. With replace=True the
+        products the file does not contain are counted as deleted. The
+        caller closes the loader, which rolls everything back.
+        """
+        latest = f"products_latest_{uuid.uuid4().hex[:12]}"
+        joined = f"{latest} s LEFT JOIN products p ON LOWER(p.sku) = s.sku_key"
+        changed = """(p.name, p.description, p.price, p.active)
+            IS DISTINCT FROM (s.name, s.description, s.price, s.active)"""
+        missing = f"NOT EXISTS (SELECT 1 FROM {latest} s WHERE s.sku_key = LOWER(p.sku))"
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"""
+                CREATE TEMP TABLE {latest} ON COMMIT DROP AS
+                SELECT DISTINCT ON (LOWER(sku)) LOWER(sku) AS sku_key, sku, name, description, price, active
+                FROM {self.staging_table}
+                ORDER BY LOWER(sku), seq DESC
+            """)
+            cursor.execute(f"CREATE INDEX ON {latest} (sku_key)")
+            cursor.execute(f"ANALYZE {latest}")
+
+            cursor.execute(f"""
+                SELECT
+                    COUNT(*) FILTER (WHERE p.id IS NULL),
+                    COUNT(*) FILTER (WHERE p.id IS NOT NULL AND {changed}),
+                    COUNT(*)
+                FROM {joined}
+            """)
+            inserted, updated, distinct = cursor.fetchone()
+
+            cursor.execute(f"""
+                SELECT s.sku, s.name, s.description, s.price, s.active
+                FROM {joined} WHERE p.id IS NULL
+                ORDER BY s.sku_key LIMIT %(limit)s
+            """, {'limit': sample_size})
+            inserted_rows = cursor.fetchall()
+
+            cursor.execute(f"""
+                SELECT p.id, p.sku, p.name, p.description, p.price, p.active,
+                    s.name, s.description, s.price, s.active
+                FROM {joined} WHERE p.id IS NOT NULL AND {changed}
+                ORDER BY s.sku_key LIMIT %(limit)s
+            """, {'limit': sample_size})
+            updated_rows = cursor.fetchall()
+
+            deleted, deleted_rows = 0, []
+            if replace:
+                cursor.execute(f"SELECT COUNT(*) FROM products p WHERE {missing}")
+                deleted = cursor.fetchone()[0]
+                cursor.execute(f"""
+                    SELECT p.id, p.sku, p.name FROM products p WHERE {missing}
+                    ORDER BY p.id LIMIT %(limit)s
+                """, {'limit': sample_size})
+                deleted_rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        return CopyLoader.diff_result(
+            self.staged, inserted, updated, distinct, deleted, inserted_rows, updated_rows, deleted_rows
+        )
+
+    @staticmethod
+    def diff_result(processed: int, inserted: int, updated: int, distinct: int, deleted: int,
+                    inserted_rows: List[tuple], updated_rows: List[tuple], deleted_rows: List[tuple]) -> Dict[str, Any]:
+        """
+        Shapes the counts and sample rows of a diff. inserted_rows hold the
+        staged (sku, name, description, price, active), updated_rows the
+        product id and sku, its current values and then the staged ones, and
+        deleted_rows (id, sku, name).
+        """
+        def value(v):
+            return float(v) if isinstance(v, Decimal) else v
+
+        fields = CopyLoader.DIFF_FIELDS
+        changes = []
+        for row in updated_rows:
+            current, staged = row[2:2 + len(fields)], row[2 + len(fields):]
+            changes.append({
+                'id': row[0],
+                'sku': row[1],
+                'changes': {
+                    field: {'from': value(old), 'to': value(new)}
+                    for field, old, new in zip(fields, current, staged)
+                    if value(old) != value(new)
+                }
+            })
+
+        return {
+            'processed': processed,
+            'inserted': inserted or 0,
+            'updated': updated or 0,
+            'unchanged': (distinct or 0) - (inserted or 0) - (updated or 0),
+            'deleted': deleted or 0,
+            'sample': {
+                'inserted': [dict(zip(('sku',) + fields, map(value, row))) for row in inserted_rows],
+                'updated': changes,
+                'deleted': [dict(zip(('id', 'sku', 'name'), row)) for row in deleted_rows]
+            }
+        }
+
+    def commit(self):
+        self.connection.commit()
+
+    def drop(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+    def close(self):
+        try:
+            self.connection.rollback()
+        finally:
+            self.connection.close()
@@ -0,0 +1,444 @@
+import codecs
+import csv
+import io
+import logging
+import os
+import re
+import sys
+import time
+from typing import Iterator, List
+import chardet
+from app.utils.import_reader import ImportReader
+from app.utils.spool import UploadSpool
+
+logger = logging.getLogger(__name__)
+
+class CSVReader(ImportReader):
+    """
+    Single-pass CSV reader. The encoding is detected once from the head of the
+    file, rows are yielded keyed by normalized headers, and the number of bytes
+    consumed is tracked so progress can be reported without a counting pass.
+
+    Files ending in .gz, .zst or .zip (a single CSV entry) are decompressed as
+    a stream. Byte offsets then refer to the uncompressed data, while
+    progress follows the position in the compressed file.
+    """
+
+    DETECT_BYTES = 10000
+    CHUNK_SIZE = 256 * 1024
+    COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd', '.zip': 'zip'}
+    FORMATS = ('csv',)
+    EXTENSIONS = {'.csv': 'csv', '.csv.gz': 'csv', '.csv.zst': 'csv', '.zip': 'csv'}
+    # Quoted fields may contain newlines, so split() tracks quote parity
+    QUOTED_NEWLINES = True
+    LINE_END = re.compile(r'\r\n|\r|\n')
+    BLANK_LINE = re.compile(rb'(?<=\n)\r?\n')
+
+    def __init__(self, filepath: str, encoding: str = None, headers: List[str] = None,
+                 start: int = 0, end: int = None, origin: int = None, follow: bool = False,
+                 idle_timeout: float = 300):
+        """
+        A reader can be limited to the byte range [start, end). Ranges other
+        than the start of the file must begin on a row boundary and need the
+        encoding and headers of the file passed in. Progress is measured from
+        origin, which defaults to start; a resumed reader passes 0 so progress
+        continues where the interrupted run left off.
+        
+        With follow=True the file is an UploadSpool that is still being
+        written: reads wait for more data until the upload is marked complete
+        and progress is relative to the bytes received so far.
+        """
+        super().__init__(filepath)
+        self.file_size = os.path.getsize(filepath)
+        self.encoding = encoding
+        self.headers: List[str] = list(headers) if headers else []
+        self.follow = follow
+        self.idle_timeout = idle_timeout
+        self.compression = CSVReader.compression_for(filepath)
+        self.start = start
+        if end is None:
+            # The uncompressed size is unknown until the stream ends
+            end = sys.maxsize if follow or self.compression else self.file_size
+        self.end = end
+        self._handle = None
+        self.origin = start if origin is None else origin
+        self.data_start = start
+        self.bytes_read = start
+
+    @staticmethod
+    def detect_encoding(head: bytes) -> str:
+        encoding = chardet.detect(head)['encoding'] or 'utf-8'
+        # A pure-ASCII head says nothing about the rest of the file; UTF-8 is a
+        # superset, so non-ASCII bytes further down still decode correctly.
+        if encoding.lower() == 'ascii':
+            encoding = 'utf-8'
+        return encoding
+
+    @staticmethod
+    def compression_for(filepath: str):
+        """Returns 'gzip', 'zstd', 'zip' or None from the file name."""
+        return CSVReader.COMPRESSIONS.get(os.path.splitext(filepath)[1].lower())
+
+    @staticmethod
+    def normalize_headers(headers: List[str]) -> List[str]:
+        if headers and headers[0].startswith('\ufeff'):
+            headers = [headers[0][1:]] + list(headers[1:])
+        return [h.strip().lower() for h in headers]
+
+    @property
+    def exact_offsets(self) -> bool:
+        """True when bytes_read always lands on a row boundary."""
+        return not codecs.lookup(self.encoding).name.startswith(('utf-16', 'utf-32'))
+
+    def progress(self) -> float:
+        if self.compression:
+            size = os.path.getsize(self.filepath)
+            if not size or (self._handle and self._handle.exhausted):
+                return 1.0
+            position = self._handle.raw_position if self._handle else 0
+            return min(position / size, 1.0)
+
+        end = os.path.getsize(self.filepath) if self.follow else self.end
+        size = end - self.origin
+        if size <= 0:
+            return 1.0
+        return min((self.bytes_read - self.origin) / size, 1.0)
+
+    def __iter__(self) -> Iterator[dict]:
+        with self._open_file() as f:
+            lines = self._open(f)
+            if lines is None:
+                return
+
+            for row in csv.DictReader(lines, fieldnames=self.headers):
+                self.rows_read += 1
+                yield row
+
+    def iter_frames(self, chunk_size: int = 10000) -> Iterator['pandas.DataFrame']:
+        """
+        Columnar variant of iteration: yields DataFrames of up to chunk_size
+        rows with every cell as a string ('' for empty or missing fields),
+        parsed by pandas' C tokenizer instead of csv.DictReader.
+        """
+        import pandas as pd
+
+        with self._open_file() as f:
+            self._detect(f)
+
+            # From the start of the file pandas parses the header itself, ranges
+            # further in reuse the headers they were given
+            from_start = self.start == 0
+            bounded = _RangeFile(f, self.start, self.end)
+            try:
+                frames = pd.read_csv(
+                    io.BufferedReader(bounded, buffer_size=CSVReader.CHUNK_SIZE),
+                    header=0 if from_start else None,
+                    names=None if from_start else self.headers,
+                    index_col=False,
+                    dtype=str,
+                    na_filter=False,
+                    encoding=self.encoding,
+                    encoding_errors='replace',
+                    chunksize=chunk_size
+                )
+            except pd.errors.EmptyDataError:
+                return
+
+            try:
+                for frame in frames:
+                    if from_start and self.rows_read == 0:
+                        self.headers = CSVReader.normalize_headers([str(c) for c in frame.columns])
+                    frame.columns = self.headers
+                    self.bytes_read = bounded.position
+                    self.rows_read += len(frame)
+                    yield frame
+                self.bytes_read = bounded.position if self.follow or self.compression else self.end
+                return
+            except pd.errors.ParserError as e:
+                # A row with more fields than the header stops the C tokenizer
+                logger.warning("Columnar parse of %s stopped after row %d (%s), reading the rest with csv",
+                               self.filepath, self.rows_read, e)
+
+        yield from self._row_frames(chunk_size, skip=self.rows_read)
+
+    def _row_frames(self, chunk_size: int, skip: int = 0) -> Iterator['pandas.DataFrame']:
+        """
+        Frames built from the csv module's rows, after the first skip rows.
+        Extra fields are dropped and missing ones left empty, as on the row
+        path, so malformed rows reach validation with the same row numbers.
+        """
+        import pandas as pd
+
+        def frame(rows):
+            return pd.DataFrame(rows, columns=self.headers, index=pd.RangeIndex(len(rows))).fillna('')
+
+        self.rows_read = 0
+        rows = []
+        for row in self:
+            if self.rows_read <= skip:
+                continue
+            rows.append([row.get(name) for name in self.headers])
+            if len(rows) >= chunk_size:
+                yield frame(rows)
+                rows = []
+        if rows:
+            yield frame(rows)
+
+    def _open_file(self):
+        if self.follow:
+            f = UploadSpool.open(self.filepath, self.idle_timeout)
+        else:
+            f = open(self.filepath, 'rb')
+
+        if self.compression:
+            f = self._handle = _DecompressedFile(f, self.compression)
+        return f
+
+    def _open(self, f) -> Iterator[str]:
+        """Positions f at the first data row of the range and returns its line iterator."""
+        self._detect(f)
+
+        f.seek(self.start)
+        lines = self._iter_lines(f)
+
+        if self.start == 0:
+            header_row = next(csv.reader(lines), None)
+            if header_row is None:
+                return None
+            self.headers = CSVReader.normalize_headers(header_row)
+            self.data_start = self.bytes_read
+
+        return lines
+
+    def _detect(self, f):
+        if self.encoding is None:
+            started = time.perf_counter()
+            self.encoding = CSVReader.detect_encoding(f.read(CSVReader.DETECT_BYTES))
+            self.detect_seconds = time.perf_counter() - started
+
+    def split(self, parts: int) -> List[tuple]:
+        """
+        Splits the data rows into at most `parts` byte ranges that each start on
+        a row boundary. A newline only counts as a boundary when an even number
+        of quote characters precede it, so quoted fields containing line breaks
+        are never cut. Sets encoding and headers as a side effect, and
+        range_rows to the number of data rows before each range, so chunks
+        can number their rows like a sequential import.
+        """
+        self.range_rows = []
+        # Compressed data cannot be entered at an arbitrary offset
+        if self.compression:
+            return []
+
+        with open(self.filepath, 'rb') as f:
+            if self._open(f) is None or not self.exact_offsets:
+                return []
+
+            data_start = self.data_start
+            size = self.file_size - data_start
+            targets = [data_start + size * i // parts for i in range(1, parts)]
+            boundaries = [data_start]
+            self.range_rows = [0]
+
+            f.seek(data_start)
+            position = data_start
+            quotes = 0
+            rows = 0
+            for block in iter(lambda: f.read(CSVReader.CHUNK_SIZE), b''):
+                while targets:
+                    offset = max(targets[0], boundaries[-1] + 1) - position
+                    if offset >= len(block):
+                        break
+                    index = block.find(b'\n', offset)
+                    while index != -1 and self.QUOTED_NEWLINES and (quotes + block.count(b'"', 0, index)) % 2:
+                        index = block.find(b'\n', index + 1)
+                    if index == -1:
+                        # No usable newline left in this block, retry from the next one
+                        targets[0] = position + len(block)
+                        break
+                    boundary = position + index + 1
+                    if boundary < self.file_size:
+                        boundaries.append(boundary)
+                        self.range_rows.append(rows + self._count_rows(block[:index + 1], quotes))
+                    targets.pop(0)
+                if targets:
+                    rows += self._count_rows(block, quotes)
+                quotes += block.count(b'"')
+                position += len(block)
+                if not targets:
+                    break
+
+        ends = boundaries[1:] + [self.file_size]
+        return list(zip(boundaries, ends))
+
+    def _count_rows(self, block: bytes, quotes: int) -> int:
+        """
+        Rows ended in block: newlines outside quoted fields (given the quote
+        count before it), less blank lines, which the csv module skips.
+        """
+        if not self.QUOTED_NEWLINES:
+            segments = [block]
+        else:
+            segments = block.split(b'"')[quotes % 2::2]
+        return sum(
+            segment.count(b'\n') - len(CSVReader.BLANK_LINE.findall(segment))
+            for segment in segments
+        )
+
+    def _iter_lines(self, f) -> Iterator[str]:
+        if not self.exact_offsets:
+            # Multi-byte newlines (UTF-16/32) cannot be split on raw bytes, so
+            # decode whole chunks and account bytes per chunk instead of per line
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            pending = ''
+            for chunk in iter(lambda: f.read(CSVReader.CHUNK_SIZE), b''):
+                self.bytes_read += len(chunk)
+                lines, pending = CSVReader._split_lines(pending + decoder.decode(chunk))
+                yield from lines
+            pending += decoder.decode(b'', final=True)
+            if pending:
+                yield pending
+            return
+
+        # Newline bytes never occur inside a multi-byte character here, so
+        # every line can be decoded on its own
+        encoding = self.encoding
+        pending = b''
+        for chunk in iter(lambda: f.read(CSVReader.CHUNK_SIZE), b''):
+            lines = (pending + chunk).splitlines(keepends=True)
+            # The last piece may be a partial line or a '\r' missing its '\n'
+            pending = lines.pop()
+            for line in lines:
+                if self.bytes_read >= self.end:
+                    return
+                self.bytes_read += len(line)
+                yield line.decode(encoding, 'replace')
+
+        if pending and self.bytes_read < self.end:
+            self.bytes_read += len(pending)
+            yield pending.decode(encoding, 'replace')
+
+    @staticmethod
+    def _split_lines(text: str) -> tuple:
+        """
+        Splits decoded text into complete lines (with their endings) and the
+        trailing partial line. Only '\r', '\n' and '\r\n' end a line, like the
+        csv module; str.splitlines would also break on U+2028 and friends. A
+        final '\r' stays pending in case its '\n' starts the next chunk.
+        """
+        lines, start = [], 0
+        for match in CSVReader.LINE_END.finditer(text):
+            if match.end() == len(text) and match.group() == '\r':
+                break
+            lines.append(text[start:match.end()])
+            start = match.end()
+        return lines, text[start:]
+
+
+class _RangeFile(io.RawIOBase):
+    """Read-only view of the byte range [start, end) of an open binary file."""
+
+    def __init__(self, f, start: int, end: int):
+        self.f = f
+        self.position = start
+        self.end = end
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.end - self.position)
+        if size <= 0:
+            return 0
+        data = self.f.read(size)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class _DecompressedFile(io.RawIOBase):
+    """
+    Uncompressed view of a gzip, zstd or single-entry zip file. Seeking
+    forward decompresses and discards; seeking backward restarts from the
+    beginning, which only happens once after encoding detection.
+    """
+
+    def __init__(self, raw, compression: str):
+        self.raw = raw
+        self.compression = compression
+        self.position = 0
+        self.exhausted = False
+        self._closed_raw_position = None
+        self.stream = self._open_stream()
+
+    @property
+    def raw_position(self) -> int:
+        if self._closed_raw_position is not None:
+            return self._closed_raw_position
+        return self.raw.tell()
+
+    def _open_stream(self):
+        self.raw.seek(0)
+        if self.compression == 'gzip':
+            import gzip
+            return gzip.GzipFile(fileobj=self.raw, mode='rb')
+        if self.compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError('Reading .zst files requires the zstandard package')
+            # closefd=False: restarting the stream must leave the raw file open
+            return zstandard.ZstdDecompressor().stream_reader(self.raw, read_across_frames=True, closefd=False)
+
+        import zipfile
+        archive = zipfile.ZipFile(self.raw)
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        if len(entries) != 1:
+            raise ValueError(f'Zip archives must contain exactly one CSV file, found {len(entries)} files')
+        return archive.open(entries[0])
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('Cannot seek from the end of a compressed stream')
+
+        if offset < self.position:
+            self.stream.close()
+            self.stream = self._open_stream()
+            self.position = 0
+            self.exhausted = False
+        while self.position < offset:
+            skipped = self.read(min(offset - self.position, CSVReader.CHUNK_SIZE))
+            if not skipped:
+                break
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.position += len(data)
+        # Trailing archive metadata (e.g. the zip directory) is never read, so flag the end explicitly
+        self.exhausted = self.exhausted or (not data and size != 0)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._closed_raw_position = self.raw.tell()
+            self.stream.close()
+            self.raw.close()
+        super().close()
@@ -1,6 +1,7 @@
 class CSVValidator:
     
     REQUIRED_FIELDS = ['sku', 'name']
+    ACTIVE_VALUES = ('true', '1', 'yes', 'active')
     
     @staticmethod
     def validate_row(row: dict, row_number: int) -> tuple[bool, str]:
@@ -42,5 +43,87 @@ class CSVValidator:
             'name': str(row.get('name', '')).strip(),
             'description': str(row.get('description', '')).strip(),
             'price': price,
-            'active': str(row.get('active', 'true')).lower() in ('true', '1', 'yes', 'active')
+            'active': str(row.get('active', 'true')).lower() in CSVValidator.ACTIVE_VALUES
         }
+    
+    @staticmethod
+    def validate_frame(frame, first_row_number: int = 1):
+        """
+        Columnar equivalent of validate_row + normalize_row for a DataFrame of
+        string cells. Returns the normalized valid rows as a DataFrame with
+        sku, name, description, price and active columns, and the error
+        messages of the rejected rows, identical to the per-row path.
+        """
+        import numpy as np
+        import pandas as pd
+        from pandas.api.types import is_bool_dtype, is_numeric_dtype
+        
+        def column(name):
+            if name not in frame.columns:
+                return pd.Series('', index=frame.index, dtype=object)
+            values = frame[name]
+            if values.dtype != object or values.hasnans:
+                values = values.fillna('').astype(str)
+            return values
+        
+        # Each column is stripped once; the required-field checks reuse them
+        stripped = {field: column(field).str.strip() for field in ('sku', 'name', 'description')}
+        sku = stripped['sku']
+        name = stripped['name']
+        typed_price = frame['price'] if 'price' in frame.columns else None
+        if typed_price is not None and is_numeric_dtype(typed_price) and not is_bool_dtype(typed_price):
+            # Typed inputs (Parquet, Arrow) need no text parsing; nulls count as absent
+            price = typed_price.astype(float)
+            has_price = price.notna()
+            unparsed = pd.Series(False, index=frame.index)
+        else:
+            raw_price = column('price')
+            stripped_price = raw_price.str.strip()
+            
+            has_price = stripped_price != ''
+            price = pd.to_numeric(stripped_price.where(has_price), errors='coerce')
+            
+            # to_numeric rejects some spellings float() accepts ('nan', '1_000');
+            # re-check the few rejected cells so both paths agree exactly
+            unparsed = has_price & price.isna()
+            for index in unparsed[unparsed].index:
+                try:
+                    price.at[index] = float(raw_price.at[index])
+                    unparsed.at[index] = False
+                except (ValueError, TypeError):
+                    pass
+        
+        # Checks are applied in reverse order of validate_row so that the
+        # first failing check of a row determines its message
+        reasons = pd.Series(None, index=frame.index, dtype=object)
+        reasons[name.str.len() > 500] = "Name too long (max 500 characters)"
+        reasons[sku.str.len() > 255] = "SKU too long (max 255 characters)"
+        reasons[has_price & (price < 0)] = "Price cannot be negative"
+        reasons[unparsed] = "Invalid price format"
+        for field in reversed(CSVValidator.REQUIRED_FIELDS):
+            reasons[stripped[field] == ''] = f"Missing required field '{field}'"
+        
+        invalid = reasons.notna().to_numpy()
+        row_numbers = np.arange(first_row_number, first_row_number + len(frame))
+        errors = [
+            f"Row {row_number}: {reason}"
+            for row_number, reason in zip(row_numbers[invalid], reasons[invalid])
+        ]
+        
+        valid = ~invalid
+        if 'active' in frame.columns and is_bool_dtype(frame['active']):
+            active = frame['active']
+        elif 'active' in frame.columns:
+            active = column('active').str.lower().isin(CSVValidator.ACTIVE_VALUES)
+        else:
+            active = pd.Series(True, index=frame.index)
+        
+        normalized = pd.DataFrame({
+            'sku': sku[valid],
+            'name': name[valid],
+            'description': stripped['description'][valid],
+            'price': price[valid].fillna(0.0).astype(float),
+            'active': active[valid].astype(bool)
+        })
+        
+        return normalized, errors
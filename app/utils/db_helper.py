@@ -1,17 +1,21 @@
+import json
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Iterable
-from sqlalchemy import text
+from typing import List, Dict, Any, Iterable, Optional
+from sqlalchemy import text, or_, func, literal_column, delete
 from sqlalchemy.dialects.postgresql import insert
 from app.extensions import db
 from app.models.product import Product
+from app.utils.redis_cache import RedisCache
 
 class DatabaseHelper:
     
     @staticmethod
-    def batch_upsert_products(products: Iterable[Dict[str, Any]], batch_size: int = 1000) -> Dict[str, int]:
+    def batch_upsert_products(products: Iterable[Dict[str, Any]], batch_size: int = 1000, metrics=None) -> Dict[str, int]:
         total_processed = 0
         total_inserted = 0
         total_updated = 0
+        total_unchanged = 0
         
         batch = []
         for product_data in products:
@@ -20,25 +24,74 @@ class DatabaseHelper:
             if len(batch) >= batch_size:
                 # Deduplicate batch to prevent CardinalityViolation
                 deduped_batch = DatabaseHelper._deduplicate_batch(batch)
-                inserted, updated = DatabaseHelper._execute_upsert_batch(deduped_batch)
+                inserted, updated, unchanged = DatabaseHelper._execute_upsert_batch(deduped_batch, metrics)
                 total_inserted += inserted
                 total_updated += updated
+                total_unchanged += unchanged
                 total_processed += len(batch)
                 batch = []
         
         if batch:
             deduped_batch = DatabaseHelper._deduplicate_batch(batch)
-            inserted, updated = DatabaseHelper._execute_upsert_batch(deduped_batch)
+            inserted, updated, unchanged = DatabaseHelper._execute_upsert_batch(deduped_batch, metrics)
             total_inserted += inserted
             total_updated += updated
+            total_unchanged += unchanged
             total_processed += len(batch)
         
         return {
             'processed': total_processed,
             'inserted': total_inserted,
-            'updated': total_updated
+            'updated': total_updated,
+            'unchanged': total_unchanged
         }
     
+    @staticmethod
+    def supports_copy() -> bool:
+        return db.engine.dialect.name == 'postgresql'
+    
+    @staticmethod
+    def estimate_count(statement) -> Optional[int]:
+        """
+        Number of rows a SELECT would return according to the PostgreSQL
+        planner statistics, without running it. None on other databases.
+        """
+        if not DatabaseHelper.supports_copy():
+            return None
+        
+        compiled = statement.compile(dialect=db.engine.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            'EXPLAIN (FORMAT JSON) ' + compiled.string, compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    
+    @staticmethod
+    def copy_upsert_products(products: Iterable[Dict[str, Any]], batch_size: int = 10000) -> Dict[str, int]:
+        """
+        Loads products through a COPY staging table and merges them in one
+        upsert. Falls back to batch_upsert_products on non-PostgreSQL databases.
+        """
+        if not DatabaseHelper.supports_copy():
+            return DatabaseHelper.batch_upsert_products(products)
+        
+        from app.utils.copy_loader import CopyLoader
+        
+        loader = CopyLoader()
+        try:
+            batch = []
+            for product_data in products:
+                batch.append(product_data)
+                if len(batch) >= batch_size:
+                    loader.copy_rows(batch)
+                    batch = []
+            if batch:
+                loader.copy_rows(batch)
+            return loader.merge()
+        finally:
+            loader.close()
+    
     @staticmethod
     def _prepare_product_data(data: Dict[str, Any]) -> Dict[str, Any]:
         now = datetime.utcnow()
@@ -53,11 +106,23 @@ class DatabaseHelper:
         }
     
     @staticmethod
-    def _execute_upsert_batch(batch: List[Dict[str, Any]]) -> tuple[int, int]:
+    def _execute_upsert_batch(batch: List[Dict[str, Any]], metrics=None, commit: bool = True) -> tuple[int, int, int]:
+        """
+        Upserts a deduplicated batch and returns (inserted, updated, unchanged).
+        Conflicting rows are only rewritten when name, description, price or
+        active actually differ, so re-importing an unchanged catalog costs
+        no row versions, WAL or index churn. Statement and commit time are
+        added to metrics (an ImportMetrics) when given.
+        
+        With commit=False the batch joins the caller's transaction, and the
+        caller commits and invalidates caches.
+        """
         if not batch:
-            return 0, 0
+            return 0, 0, 0
         
-        stmt = insert(Product.__table__).values(batch)
+        started = time.perf_counter()
+        table = Product.__table__
+        stmt = insert(table).values(batch)
         
         update_dict = {
             'name': stmt.excluded.name,
@@ -69,16 +134,90 @@ class DatabaseHelper:
         
         upsert_stmt = stmt.on_conflict_do_update(
             index_elements=[text('LOWER(sku)')],
-            set_=update_dict
+            set_=update_dict,
+            where=or_(
+                table.c.name.is_distinct_from(stmt.excluded.name),
+                table.c.description.is_distinct_from(stmt.excluded.description),
+                table.c.price.is_distinct_from(stmt.excluded.price),
+                table.c.active.is_distinct_from(stmt.excluded.active)
+            )
         )
         
-        result = db.session.execute(upsert_stmt)
-        db.session.commit()
+        if DatabaseHelper.supports_copy():
+            # xmax is 0 only for freshly inserted row versions; skipped rows are not returned
+            rows = db.session.execute(
+                upsert_stmt.returning(literal_column('(xmax = 0)').label('inserted'))
+            ).fetchall()
+            inserted = sum(1 for row in rows if row.inserted)
+            updated = len(rows) - inserted
+        else:
+            existing = DatabaseHelper._count_existing([item['sku'] for item in batch])
+            result = db.session.execute(upsert_stmt)
+            inserted = len(batch) - existing
+            updated = result.rowcount - inserted
+        
+        executed = time.perf_counter()
+        if commit:
+            db.session.commit()
+        
+        if metrics:
+            metrics.add('upsert', executed - started)
+            metrics.add('commit', time.perf_counter() - executed)
         
-        inserted = result.rowcount if hasattr(result, 'rowcount') else len(batch)
-        updated = 0
+        if commit and (inserted or updated):
+            # Product list ETags are derived from this counter
+            RedisCache.bump('listing')
         
-        return inserted, updated
+        unchanged = len(batch) - inserted - updated
+        return inserted, updated, unchanged
+    
+    @staticmethod
+    def _count_existing(skus: List[str]) -> int:
+        return db.session.query(func.count(Product.id)).filter(
+            func.lower(Product.sku).in_([sku.lower() for sku in skus])
+        ).scalar()
+    
+    @staticmethod
+    def count_matching_products(filters: list = None) -> int:
+        """Number of products matching filters."""
+        return db.session.query(func.count(Product.id)).filter(*(filters or [])).scalar()
+    
+    @staticmethod
+    def next_product_range(after_id: int, size: int, filters: list = None) -> Optional[tuple]:
+        """
+        (first id, last id) of the next `size` products matching filters with
+        id > after_id, found by walking the primary key index, or None when
+        none are left. Gaps in the ids never yield empty ranges.
+        """
+        ids = (
+            db.session.query(Product.id)
+            .filter(Product.id > after_id, *(filters or []))
+            .order_by(Product.id)
+            .limit(size)
+            .subquery()
+        )
+        first_id, last_id = db.session.query(func.min(ids.c.id), func.max(ids.c.id)).one()
+        return (first_id, last_id) if first_id is not None else None
+    
+    @staticmethod
+    def delete_product_range(first_id: int, last_id: int, filters: list = None) -> int:
+        """
+        Deletes the matching products with first_id <= id <= last_id in a
+        single set-based DELETE and commits. Returns the number deleted.
+        """
+        result = db.session.execute(
+            delete(Product)
+            .where(Product.id.between(first_id, last_id), *(filters or []))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def truncate_products():
+        """Empties the products table at once (PostgreSQL only)."""
+        db.session.execute(text('TRUNCATE TABLE products'))
+        db.session.commit()
     
     @staticmethod
     def bulk_delete_products() -> int:
@@ -0,0 +1,28 @@
+import json
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    # Listed in requirements.txt; the standard library produces the same bytes
+    orjson = None
+
+class FastJSON:
+    """
+    JSON encoding for large responses, byte-for-byte what Flask's jsonify
+    writes outside debug mode: sorted keys, compact separators, non-ASCII
+    escaped and a trailing newline. Uses orjson, which cannot escape
+    non-ASCII, so such payloads go through the standard library instead.
+    """
+    
+    @staticmethod
+    def dumps(obj) -> bytes:
+        if orjson is not None:
+            body = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+            if body.isascii():
+                return body
+        return (json.dumps(obj, sort_keys=True, separators=(',', ':')) + '\n').encode('ascii')
+    
+    @staticmethod
+    def response(body: bytes) -> Response:
+        return Response(body, mimetype='application/json')
@@ -0,0 +1,35 @@
+import hashlib
+import json
+from flask import Response, jsonify, request
+
+class HTTPCache:
+    """
+    Conditional GET support. An endpoint derives a weak ETag from something
+    cheaper than its body (a timestamp, a generation counter or a small
+    payload) and respond() answers a matching If-None-Match with an empty
+    304 before the body is built or serialized.
+    """
+    
+    @staticmethod
+    def etag(*parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:24]
+    
+    @staticmethod
+    def body_etag(body: bytes) -> str:
+        return hashlib.sha1(body).hexdigest()[:24]
+    
+    @staticmethod
+    def respond(tag: str, build, cache_control: str = 'no-cache', render=jsonify):
+        """
+        build() returns the body and is only called when the client's copy is
+        stale; render turns it into the response.
+        """
+        if request.if_none_match.contains_weak(tag):
+            response = Response(status=304)
+        else:
+            response = render(build())
+        
+        response.set_etag(tag, weak=True)
+        response.headers['Cache-Control'] = cache_control
+        return response
@@ -0,0 +1,68 @@
+import time
+from collections import deque
+from typing import Dict
+
+class ImportMetrics:
+    """
+    Per-stage timing and throughput of one import. Stages accumulate seconds
+    spent in them (detect_encoding, parse, validate, normalize, dedupe,
+    upsert, commit, and stage/merge for the COPY engine). With the pipeline
+    enabled parsing and writing overlap, so the stage total can exceed the
+    wall time.
+
+    Throughput is a rolling rate over the last few batches so the ETA follows
+    the current speed of the database rather than the average since start.
+    """
+
+    WINDOW = 10
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.rows = 0
+        self._samples = deque([(self.started, 0)], maxlen=ImportMetrics.WINDOW + 1)
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def record_rows(self, processed: int):
+        self.rows = processed
+        self._samples.append((time.perf_counter(), processed))
+
+    def rows_per_second(self) -> float:
+        (first_time, first_rows), (last_time, last_rows) = self._samples[0], self._samples[-1]
+        if last_time <= first_time:
+            return 0.0
+        return (last_rows - first_rows) / (last_time - first_time)
+
+    def eta_seconds(self, total_rows: int):
+        rate = self.rows_per_second()
+        if rate <= 0 or total_rows is None:
+            return None
+        return max(total_rows - self.rows, 0) / rate
+
+    def to_dict(self) -> dict:
+        wall = time.perf_counter() - self.started
+        return {
+            'wall_seconds': round(wall, 3),
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / wall, 1) if wall > 0 else None,
+            'stages': {stage: round(seconds, 3) for stage, seconds in self.stages.items()}
+        }
+
+    @staticmethod
+    def merge(metrics: list) -> dict:
+        """Combines the to_dict() results of parallel chunks; wall time is the slowest chunk."""
+        stages = {}
+        for item in metrics:
+            for stage, seconds in item['stages'].items():
+                stages[stage] = round(stages.get(stage, 0.0) + seconds, 3)
+        wall = max((item['wall_seconds'] for item in metrics), default=0.0)
+        rows = sum(item['rows'] for item in metrics)
+        return {
+            'wall_seconds': wall,
+            'rows': rows,
+            'rows_per_second': round(rows / wall, 1) if wall > 0 else None,
+            'chunks': len(metrics),
+            'stages': stages
+        }
@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from typing import Iterable, Iterator
+
+class ImportPipeline:
+    """
+    Bounded producer/consumer stage for imports. A background thread pulls
+    parsed and validated batches from `source` into a queue of at most
+    queue_depth batches while the iterating thread writes them to the
+    database, so parsing and DB round trips overlap. A full queue blocks the
+    producer, which keeps memory bounded when the database is the slower side.
+
+    Busy and idle seconds are recorded for both sides: a producer that is
+    mostly idle means the database is the bottleneck, a mostly idle consumer
+    means parsing is.
+
+    The producer thread is the only one touching the reader. When one is
+    given, its progress is captured with every batch, and `reader` holds the
+    capture of the batch last handed to the consumer.
+    """
+
+    _DONE = object()
+
+    def __init__(self, source: Iterable, queue_depth: int = 4, reader=None):
+        self.source = source
+        self.source_reader = reader
+        self.reader = _ReaderSnapshot(reader) if reader is not None else None
+        self.queue_depth = max(1, queue_depth)
+        self.queue = queue.Queue(maxsize=self.queue_depth)
+        self.batches = 0
+        self.producer_busy = 0.0
+        self.producer_idle = 0.0
+        self.consumer_busy = 0.0
+        self.consumer_idle = 0.0
+        self._error = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name='import-pipeline-producer', daemon=True)
+
+    def __iter__(self) -> Iterator:
+        self._thread.start()
+        try:
+            returned = None
+            while True:
+                waiting = time.perf_counter()
+                if returned is not None:
+                    self.consumer_busy += waiting - returned
+                item = self.queue.get()
+                returned = time.perf_counter()
+                self.consumer_idle += returned - waiting
+
+                if item is ImportPipeline._DONE:
+                    break
+                item, snapshot = item
+                if snapshot is not None:
+                    self.reader = snapshot
+                self.batches += 1
+                yield item
+
+            if self._error is not None:
+                raise self._error
+        finally:
+            self.close()
+
+    def close(self):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth,
+            'batches': self.batches,
+            'producer_busy': round(self.producer_busy, 3),
+            'producer_idle': round(self.producer_idle, 3),
+            'consumer_busy': round(self.consumer_busy, 3),
+            'consumer_idle': round(self.consumer_idle, 3),
+            'bottleneck': 'database' if self.consumer_busy >= self.producer_busy else 'parser'
+        }
+
+    def _produce(self):
+        try:
+            iterator = iter(self.source)
+            while not self._stopped.is_set():
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                snapshot = _ReaderSnapshot(self.source_reader) if self.source_reader is not None else None
+                produced = time.perf_counter()
+                self.producer_busy += produced - started
+
+                if not self._put((item, snapshot)):
+                    return
+                self.producer_idle += time.perf_counter() - produced
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(ImportPipeline._DONE)
+
+    def _put(self, item) -> bool:
+        # Poll so a consumer that stopped early never leaves the producer blocked
+        while not self._stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+class _ReaderSnapshot:
+    """The progress-related state of a reader at one point, safe to read from another thread."""
+
+    def __init__(self, reader):
+        self.filepath = reader.filepath
+        self.encoding = reader.encoding
+        self.headers = list(reader.headers)
+        self.bytes_read = reader.bytes_read
+        self.rows_read = reader.rows_read
+        self.fraction = reader.progress()
+
+    def progress(self) -> float:
+        return self.fraction
@@ -0,0 +1,99 @@
+import math
+from typing import Iterator, List, Optional
+
+class ImportReader:
+    """
+    Interface shared by the import readers. A reader yields each record as a
+    dict of string cells keyed by lowercase field name (__iter__), or the same
+    data as pandas DataFrames (iter_frames), so validation and upserts do not
+    depend on the file format. progress() is the fraction of the input read.
+    
+    Readers whose bytes_read always lands on a record boundary report
+    exact_offsets; only those can be checkpointed, resumed at a byte offset
+    and split() into ranges for parallel imports.
+    
+    The registry below maps file names and magic bytes to reader classes.
+    """
+    
+    FORMATS = ()
+    # File name suffix -> format
+    EXTENSIONS = {}
+    # Leading bytes -> format, trusted over the file name
+    MAGIC = {}
+    # Formats whose metadata sits at the end of the file cannot be read while uploading
+    STREAMABLE = True
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.encoding = None
+        self.headers: List[str] = []
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.detect_seconds = 0.0
+    
+    @property
+    def exact_offsets(self) -> bool:
+        return False
+    
+    def progress(self) -> float:
+        raise NotImplementedError
+    
+    def __iter__(self) -> Iterator[dict]:
+        raise NotImplementedError
+    
+    def iter_frames(self, chunk_size: int = 10000) -> Iterator['pandas.DataFrame']:
+        raise NotImplementedError
+    
+    def split(self, parts: int) -> List[tuple]:
+        return []
+    
+    @staticmethod
+    def to_cell(value) -> str:
+        """Formats a typed value the way it would appear in a CSV cell."""
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return ''
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
+    
+    @staticmethod
+    def readers() -> list:
+        from app.utils.csv_reader import CSVReader
+        from app.utils.ndjson_reader import NDJSONReader
+        from app.utils.arrow_reader import ArrowReader
+        return [CSVReader, NDJSONReader, ArrowReader]
+    
+    @staticmethod
+    def detect_format(filename: str, head: bytes = None) -> Optional[str]:
+        """
+        Returns the format of a file from its leading bytes when they are
+        conclusive, else from the longest matching extension, or None.
+        """
+        readers = ImportReader.readers()
+        
+        if head:
+            for reader in readers:
+                for magic, file_format in reader.MAGIC.items():
+                    if head.startswith(magic):
+                        return file_format
+        
+        name = filename.lower()
+        matches = [
+            (len(extension), file_format)
+            for reader in readers
+            for extension, file_format in reader.EXTENSIONS.items()
+            if name.endswith(extension)
+        ]
+        return max(matches)[1] if matches else None
+    
+    @staticmethod
+    def for_format(file_format: str) -> type:
+        for reader in ImportReader.readers():
+            if file_format in reader.FORMATS:
+                return reader
+        raise ValueError(f"Unsupported import format '{file_format}'")
+    
+    @staticmethod
+    def for_file(filepath: str, file_format: str = None) -> type:
+        file_format = file_format or ImportReader.detect_format(filepath) or 'csv'
+        return ImportReader.for_format(file_format)
@@ -0,0 +1,68 @@
+import json
+from typing import Iterator, List
+from app.utils.csv_reader import CSVReader
+from app.utils.import_reader import ImportReader
+
+class NDJSONReader(CSVReader):
+    """
+    Newline-delimited JSON reader: one JSON object per line. It reuses the
+    byte-line machinery of CSVReader, so byte ranges, checkpoints, streaming
+    and compressed files work the same way. JSON is always UTF-8 and escapes
+    newlines inside strings, so every newline is a record boundary.
+    
+    Values are turned into CSV-style cells (numbers as text, booleans as
+    'true'/'false', null as ''). A line that is not a JSON object yields an
+    empty record, which validation rejects like a row without a SKU.
+    """
+    
+    FORMATS = ('ndjson',)
+    EXTENSIONS = {
+        '.ndjson': 'ndjson', '.jsonl': 'ndjson',
+        '.ndjson.gz': 'ndjson', '.jsonl.gz': 'ndjson',
+        '.ndjson.zst': 'ndjson', '.jsonl.zst': 'ndjson'
+    }
+    QUOTED_NEWLINES = False
+    
+    def __init__(self, filepath: str, encoding: str = None, headers: List[str] = None, **kwargs):
+        super().__init__(filepath, encoding=encoding or 'utf-8', headers=headers, **kwargs)
+    
+    def __iter__(self) -> Iterator[dict]:
+        with self._open_file() as f:
+            for line in self._open(f):
+                if not line.strip():
+                    continue
+                
+                try:
+                    record = json.loads(line.lstrip('\ufeff'))
+                except ValueError:
+                    record = None
+                
+                row = {}
+                if isinstance(record, dict):
+                    row = {key.strip().lower(): ImportReader.to_cell(value) for key, value in record.items()}
+                    if not self.headers:
+                        self.headers = list(row)
+                
+                self.rows_read += 1
+                yield row
+    
+    def iter_frames(self, chunk_size: int = 10000) -> Iterator['pandas.DataFrame']:
+        import pandas as pd
+        
+        def frame(rows):
+            # An explicit index keeps rows that had no valid object (and so no columns)
+            return pd.DataFrame(rows, index=pd.RangeIndex(len(rows))).fillna('')
+        
+        rows = []
+        for row in self:
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield frame(rows)
+                rows = []
+        if rows:
+            yield frame(rows)
+    
+    def _open(self, f) -> Iterator[str]:
+        # No header line: data starts at the first byte of the range
+        f.seek(self.start)
+        return self._iter_lines(f)
@@ -29,3 +29,17 @@ class ProgressTracker:
         key = f"job:{job_id}:progress"
         data = self.redis_client.get(key)
         return json.loads(data) if data else None
+    
+    def increment_counters(self, job_id: str, **amounts) -> dict:
+        """Atomically adds to the shared counters of a job and returns their new values."""
+        key = f"job:{job_id}:counters"
+        pipe = self.redis_client.pipeline()
+        for field, amount in amounts.items():
+            pipe.hincrby(key, field, amount)
+        pipe.expire(key, 3600)
+        pipe.hgetall(key)
+        counters = pipe.execute()[-1]
+        return {field: int(value) for field, value in counters.items()}
+    
+    def clear_counters(self, job_id: str):
+        self.redis_client.delete(f"job:{job_id}:counters")
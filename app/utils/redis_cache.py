@@ -0,0 +1,121 @@
+import json
+import logging
+import redis
+from typing import Optional
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+class RedisCache:
+    """
+    Best-effort JSON cache for expensive reads. When CACHE_ENABLED is off or
+    Redis cannot be reached, get() misses and set()/delete() do nothing, so
+    callers always fall back to the database.
+    """
+    
+    _client = None
+    
+    @staticmethod
+    def client():
+        if not current_app.config.get('CACHE_ENABLED', True):
+            return None
+        
+        if RedisCache._client is None:
+            # Short timeouts: a slow cache must not be slower than the query it saves
+            RedisCache._client = redis.from_url(
+                current_app.config['CELERY_BROKER_URL'],
+                decode_responses=True,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        return RedisCache._client
+    
+    @staticmethod
+    def get(key: str):
+        client = RedisCache.client()
+        if client is None:
+            return None
+        
+        try:
+            data = client.get(key)
+        except redis.RedisError as e:
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None
+        return json.loads(data) if data is not None else None
+    
+    @staticmethod
+    def get_many(*keys: str) -> Optional[list]:
+        """Values of several keys in one round trip (None per missing key), or None when Redis is unavailable."""
+        client = RedisCache.client()
+        if client is None:
+            return None
+        
+        try:
+            values = client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning("Cache read failed for %s: %s", keys, e)
+            return None
+        return [json.loads(value) if value is not None else None for value in values]
+    
+    @staticmethod
+    def set(key: str, value, ttl: int):
+        client = RedisCache.client()
+        if client is None:
+            return
+        
+        try:
+            client.setex(key, ttl, json.dumps(value))
+        except redis.RedisError as e:
+            logger.warning("Cache write failed for %s: %s", key, e)
+    
+    @staticmethod
+    def delete(*keys: str):
+        client = RedisCache.client()
+        if client is None or not keys:
+            return
+        
+        try:
+            client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning("Cache delete failed for %s: %s", keys, e)
+    
+    @staticmethod
+    def generation_key(name: str) -> str:
+        return f"generation:{name}"
+    
+    @staticmethod
+    def generation(name: str) -> Optional[int]:
+        """
+        Current value of a generation counter (0 before the first bump), or
+        None when Redis is disabled or unreachable, so no cache can be trusted.
+        """
+        client = RedisCache.client()
+        if client is None:
+            return None
+        
+        try:
+            return int(client.get(RedisCache.generation_key(name)) or 0)
+        except redis.RedisError as e:
+            logger.warning("Cache generation read failed for %s: %s", name, e)
+            return None
+    
+    @staticmethod
+    def bump(*names: str, ttl: int = None):
+        """
+        Advances generation counters in one round trip, invalidating everything
+        cached under their old values. With ttl the counters expire that many
+        seconds after their last bump.
+        """
+        client = RedisCache.client()
+        if client is None or not names:
+            return
+        
+        try:
+            pipe = client.pipeline(transaction=False)
+            for name in names:
+                pipe.incr(RedisCache.generation_key(name))
+                if ttl:
+                    pipe.expire(RedisCache.generation_key(name), ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Cache generation bump failed for %s: %s", names, e)
@@ -0,0 +1,127 @@
+import io
+import os
+import time
+
+class UploadSpool:
+    """
+    File an upload is streamed into while the import reads it. The writer
+    appends the request body chunk by chunk and finally creates a marker file
+    next to the spool: `<spool>.complete` once the body was fully received,
+    `<spool>.aborted` when the transfer broke off. Readers opened with
+    UploadSpool.open block at the current end of the spool until more bytes
+    or a marker arrive, so the file looks like a normal file that is only
+    slow to read.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    POLL_INTERVAL = 0.2
+    
+    @staticmethod
+    def complete_marker(filepath: str) -> str:
+        return f"{filepath}.complete"
+    
+    @staticmethod
+    def aborted_marker(filepath: str) -> str:
+        return f"{filepath}.aborted"
+    
+    @staticmethod
+    def markers(filepath: str) -> list:
+        return [UploadSpool.complete_marker(filepath), UploadSpool.aborted_marker(filepath)]
+    
+    @staticmethod
+    def is_complete(filepath: str) -> bool:
+        return os.path.exists(UploadSpool.complete_marker(filepath))
+    
+    @staticmethod
+    def write(stream, filepath: str, chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Copies stream into the spool, flushing every chunk so readers see it
+        immediately, and marks the spool complete. Any error marks it aborted
+        and is re-raised. Returns the number of bytes written.
+        """
+        written = 0
+        try:
+            with open(filepath, 'ab') as f:
+                for chunk in iter(lambda: stream.read(chunk_size), b''):
+                    f.write(chunk)
+                    f.flush()
+                    written += len(chunk)
+        except BaseException:
+            UploadSpool._touch(UploadSpool.aborted_marker(filepath))
+            raise
+        
+        UploadSpool._touch(UploadSpool.complete_marker(filepath))
+        return written
+    
+    @staticmethod
+    def open(filepath: str, idle_timeout: float = 300) -> '_TailFile':
+        """
+        Opens the spool for reading. A read that finds no new bytes for
+        idle_timeout seconds, or an aborted upload, raises IOError.
+        """
+        return _TailFile(filepath, idle_timeout)
+    
+    @staticmethod
+    def _touch(path: str):
+        with open(path, 'a'):
+            pass
+
+
+class _TailFile(io.RawIOBase):
+    """Binary reader over a growing spool; reads wait for data until the upload completes."""
+    
+    def __init__(self, filepath: str, idle_timeout: float):
+        self.filepath = filepath
+        self.idle_timeout = idle_timeout
+        self.f = open(filepath, 'rb')
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.f.seek(offset, whence)
+    
+    def tell(self) -> int:
+        return self.f.tell()
+    
+    def close(self):
+        self.f.close()
+        super().close()
+    
+    def read(self, size: int = -1) -> bytes:
+        """Returns size bytes (everything when size < 0), or fewer only at the end of a complete upload."""
+        data = bytearray()
+        waited_since = None
+        
+        while size < 0 or len(data) < size:
+            chunk = self.f.read(-1 if size < 0 else size - len(data))
+            if chunk:
+                data += chunk
+                waited_since = None
+                continue
+            
+            # Check the marker before concluding: bytes written before it was created are already visible
+            if UploadSpool.is_complete(self.filepath):
+                chunk = self.f.read(-1 if size < 0 else size - len(data))
+                if not chunk:
+                    break
+                data += chunk
+                continue
+            if os.path.exists(UploadSpool.aborted_marker(self.filepath)):
+                raise IOError(f"Upload of {os.path.basename(self.filepath)} was aborted")
+            
+            now = time.monotonic()
+            waited_since = waited_since or now
+            if now - waited_since > self.idle_timeout:
+                raise IOError(f"Upload of {os.path.basename(self.filepath)} stalled for {self.idle_timeout}s")
+            time.sleep(UploadSpool.POLL_INTERVAL)
+        
+        return bytes(data)
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
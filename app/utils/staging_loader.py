@@ -0,0 +1,182 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable
+from sqlalchemy import Boolean, Numeric, column, delete, exists, func, insert, literal, or_, select, table, text, update
+from app.extensions import db
+from app.utils.copy_loader import CopyLoader
+from app.models.product import Product
+
+class StagingLoader:
+    """
+    Portable counterpart of CopyLoader for databases without COPY (SQLite in
+    development and tests). Rows are inserted into a temporary table and
+    applied with set-based statements at the end. Like CopyLoader it holds
+    its own connection, which the temporary tables are bound to.
+    """
+    
+    def __init__(self):
+        suffix = uuid.uuid4().hex[:12]
+        self.staging_table = f"products_staging_{suffix}"
+        self.latest_table = f"products_latest_{suffix}"
+        self.staged = 0
+        self.connection = db.engine.connect()
+        self.connection.execute(text(f"""
+            CREATE TEMPORARY TABLE {self.staging_table} (
+                seq INTEGER NOT NULL,
+                sku VARCHAR(255) NOT NULL,
+                name VARCHAR(500) NOT NULL,
+                description TEXT,
+                price NUMERIC(10, 2) NOT NULL,
+                active BOOLEAN NOT NULL
+            )
+        """))
+        self.staging = table(
+            self.staging_table,
+            column('seq'), column('sku'), column('name'), column('description'), column('price'), column('active')
+        )
+    
+    def copy_rows(self, products: Iterable[Dict[str, Any]]) -> int:
+        rows = [
+            {
+                'seq': self.staged + i,
+                'sku': product.get('sku', '').strip(),
+                'name': product.get('name', '').strip(),
+                'description': product.get('description', ''),
+                'price': float(product.get('price', 0)),
+                'active': bool(product.get('active', True))
+            }
+            for i, product in enumerate(products)
+        ]
+        if rows:
+            self.connection.execute(insert(self.staging), rows)
+        self.staged += len(rows)
+        return len(rows)
+    
+    def copy_frame(self, frame) -> int:
+        return self.copy_rows(frame.to_dict('records'))
+    
+    def _build_latest(self):
+        """Collapses the staged rows to the last one per LOWER(sku), like CopyLoader.merge."""
+        self.connection.execute(text(f"""
+            CREATE TEMPORARY TABLE {self.latest_table} AS
+            SELECT LOWER(sku) AS sku_key, sku, name, description, price, active
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY LOWER(sku) ORDER BY seq DESC) AS position
+                FROM {self.staging_table}
+            ) ranked
+            WHERE position = 1
+        """))
+        self.connection.execute(text(f"CREATE INDEX ix_{self.latest_table} ON {self.latest_table} (sku_key)"))
+        return table(
+            self.latest_table,
+            column('sku_key'), column('sku'), column('name'), column('description'),
+            column('price', Numeric(10, 2)), column('active', Boolean)
+        )
+    
+    def replace(self) -> Dict[str, int]:
+        """
+        Makes products exactly the staged catalog in one transaction: changed
+        rows are updated, new ones inserted and products missing from the
+        file deleted, then everything is committed at once, so readers see
+        either the old catalog or the new one. Unchanged rows keep their
+        updated_at.
+        """
+        now = datetime.utcnow()
+        products = Product.__table__
+        try:
+            latest = self._build_latest()
+            match = latest.c.sku_key == func.lower(products.c.sku)
+            changed = or_(*[
+                latest.c[name].is_distinct_from(products.c[name])
+                for name in CopyLoader.DIFF_FIELDS
+            ])
+            
+            distinct = self.connection.execute(select(func.count()).select_from(latest)).scalar()
+            inserted = self.connection.execute(
+                select(func.count()).select_from(latest).where(~exists().where(match))
+            ).scalar()
+            updated = self.connection.execute(
+                select(func.count()).select_from(latest).where(exists().where(match, changed))
+            ).scalar()
+            
+            def staged(name):
+                return select(latest.c[name]).where(match).scalar_subquery()
+            
+            self.connection.execute(
+                update(products)
+                .where(exists().where(match, changed))
+                .values(
+                    name=staged('name'),
+                    description=staged('description'),
+                    price=staged('price'),
+                    active=staged('active'),
+                    updated_at=now
+                )
+            )
+            deleted = self.connection.execute(delete(products).where(~exists().where(match))).rowcount
+            self.connection.execute(insert(products).from_select(
+                ['sku', 'name', 'description', 'price', 'active', 'created_at', 'updated_at'],
+                select(
+                    latest.c.sku, latest.c.name, latest.c.description, latest.c.price, latest.c.active,
+                    literal(now), literal(now)
+                ).where(~exists().where(match))
+            ))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        
+        return {
+            'processed': self.staged,
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': distinct - inserted - updated,
+            'deleted': deleted
+        }
+    
+    def diff(self, replace: bool = False, sample_size: int = 20) -> Dict[str, Any]:
+        """
+        Compares the staged rows with products by LOWER(sku) without writing
+        anything, in the shape of CopyLoader.diff.
+        """
+        products = Product.__table__
+        latest = self._build_latest()
+        match = latest.c.sku_key == func.lower(products.c.sku)
+        changed = or_(*[
+            latest.c[name].is_distinct_from(products.c[name])
+            for name in CopyLoader.DIFF_FIELDS
+        ])
+        new = select(latest.c.sku, *[latest.c[name] for name in CopyLoader.DIFF_FIELDS]).where(~exists().where(match))
+        changes = select(
+            products.c.id, products.c.sku,
+            *[products.c[name] for name in CopyLoader.DIFF_FIELDS],
+            *[latest.c[name] for name in CopyLoader.DIFF_FIELDS]
+        ).select_from(latest.join(products, match)).where(changed)
+        
+        distinct = self.connection.execute(select(func.count()).select_from(latest)).scalar()
+        inserted = self.connection.execute(select(func.count()).select_from(new.subquery())).scalar()
+        updated = self.connection.execute(select(func.count()).select_from(changes.subquery())).scalar()
+        inserted_rows = self.connection.execute(new.order_by(latest.c.sku_key).limit(sample_size)).all()
+        updated_rows = self.connection.execute(changes.order_by(latest.c.sku_key).limit(sample_size)).all()
+        
+        deleted, deleted_rows = 0, []
+        if replace:
+            missing = ~exists().where(match)
+            deleted = self.connection.execute(select(func.count()).select_from(products).where(missing)).scalar()
+            deleted_rows = self.connection.execute(
+                select(products.c.id, products.c.sku, products.c.name)
+                .where(missing).order_by(products.c.id).limit(sample_size)
+            ).all()
+        
+        return CopyLoader.diff_result(
+            self.staged, inserted, updated, distinct, deleted, inserted_rows, updated_rows, deleted_rows
+        )
+    
+    def close(self):
+        try:
+            self.connection.rollback()
+            for name in (self.latest_table, self.staging_table):
+                self.connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            self.connection.commit()
+        finally:
+            self.connection.close()
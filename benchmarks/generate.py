@@ -0,0 +1,54 @@
+import csv
+import random
+
+HEADERS = ['sku', 'name', 'description', 'price', 'active']
+
+ADJECTIVES = ['Compact', 'Deluxe', 'Rugged', 'Smart', 'Classic', 'Ultra', 'Eco', 'Pro', 'Café', 'Größe']
+NOUNS = ['Widget', 'Lamp', 'Kettle', 'Drill', 'Backpack', 'Monitor', 'Chair', 'Speaker', 'Jacket', 'Router']
+
+def generate_catalog(filepath: str, rows: int, encoding: str = 'utf-8', duplicate_rate: float = 0.0,
+                     error_rate: float = 0.0, seed: int = 0) -> dict:
+    """
+    Writes a synthetic product CSV with `rows` data rows. A duplicate_rate
+    share of rows repeats an earlier SKU (in a different case half of the
+    time) and an error_rate share fails validation in one of the ways
+    CSVValidator rejects. Names include non-ASCII characters so the encoding
+    matters. Returns the counts that were actually generated.
+    """
+    rng = random.Random(seed)
+    skus = []
+    duplicates = 0
+    errors = 0
+
+    with open(filepath, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+
+        for i in range(rows):
+            if skus and rng.random() < duplicate_rate:
+                sku = rng.choice(skus)
+                if rng.random() < 0.5:
+                    sku = sku.lower()
+                duplicates += 1
+            else:
+                sku = f"SKU-{i:08d}"
+                skus.append(sku)
+
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+            description = f"Synthetic product {i}, batch {i // 1000}" if rng.random() < 0.8 else ''
+            price = f"{rng.uniform(0.5, 999.99):.2f}"
+            active = 'true' if rng.random() < 0.9 else 'false'
+
+            if rng.random() < error_rate:
+                errors += 1
+                kind = rng.randrange(3)
+                if kind == 0:
+                    name = ''
+                elif kind == 1:
+                    price = f"-{price}"
+                else:
+                    price = 'n/a'
+
+            writer.writerow([sku, name, description, price, active])
+
+    return {'rows': rows, 'duplicates': duplicates, 'errors': errors}
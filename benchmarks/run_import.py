@@ -0,0 +1,253 @@
+"""
+Import throughput benchmark. Generates synthetic catalogs and drives
+process_csv_file and DatabaseHelper.batch_upsert_products directly, without
+Celery or Redis, on the SQLite testing database or the PostgreSQL database
+given with --database-url (its products table is emptied before every run).
+
+    python -m benchmarks.run_import --rows 10000,100000 --modes rows,columnar
+
+Every scenario runs in a fresh process so peak RSS is its own. Results are
+printed and written as JSON for comparison between runs.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+
+STAGES = ['decode', 'validate', 'dedupe', 'db_write']
+
+class NullTracker:
+    """Stands in for ProgressTracker so no Redis is needed."""
+
+    def publish_progress(self, *args, **kwargs):
+        pass
+
+class StageTimer:
+    """
+    Times stages by wrapping the functions that implement them. Time is
+    exclusive: a stage called from inside another (validation within the
+    dedupe pre-pass) is not counted twice.
+    """
+
+    def __init__(self):
+        self.totals = {stage: 0.0 for stage in STAGES}
+        self._stack = []
+        self._patches = []
+
+    def wrap(self, owner, attribute: str, stage: str):
+        original = getattr(owner, attribute)
+        timer = self
+
+        def timed(*args, **kwargs):
+            timer._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                nested = timer._stack.pop()
+                timer.totals[stage] += elapsed - nested
+                if timer._stack:
+                    timer._stack[-1] += elapsed
+
+        original_attribute = owner.__dict__[attribute]
+        self._patches.append((owner, attribute, original_attribute))
+        # Instance methods (CopyLoader) stay plain functions so they still bind self
+        setattr(owner, attribute, staticmethod(timed) if isinstance(original_attribute, staticmethod) else timed)
+
+    def restore(self):
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches = []
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_scenario(scenario: dict) -> dict:
+    """Runs one scenario in the current process and returns its measurements."""
+    from app import create_app
+    from app.extensions import db
+    from app.models.product import Product
+    from app.tasks.csv_import import process_csv_file
+    from app.utils.copy_loader import CopyLoader
+    from app.utils.csv_validator import CSVValidator
+    from app.utils.db_helper import DatabaseHelper
+    from app.utils.sku_index import SkuIndex
+    from app.utils.csv_reader import CSVReader
+    from benchmarks.generate import generate_catalog
+
+    app = create_app('benchmark')
+    with app.app_context():
+        db.create_all()
+        db.session.query(Product).delete()
+        db.session.commit()
+
+        generated = generate_catalog(
+            scenario['filepath'], scenario['rows'],
+            encoding=scenario['encoding'],
+            duplicate_rate=scenario['duplicate_rate'],
+            error_rate=scenario['error_rate'],
+            seed=scenario['seed']
+        )
+        file_size = os.path.getsize(scenario['filepath'])
+
+        timer = StageTimer()
+        timer.wrap(CSVValidator, 'validate_row', 'validate')
+        timer.wrap(CSVValidator, 'normalize_row', 'validate')
+        timer.wrap(CSVValidator, 'validate_frame', 'validate')
+        timer.wrap(SkuIndex, 'build', 'dedupe')
+        timer.wrap(DatabaseHelper, 'batch_upsert_products', 'db_write')
+        timer.wrap(DatabaseHelper, '_deduplicate_batch', 'dedupe')
+        # The COPY engine writes through the staging loader instead of batch_upsert_products
+        timer.wrap(CopyLoader, 'copy_rows', 'db_write')
+        timer.wrap(CopyLoader, 'copy_frame', 'db_write')
+        timer.wrap(CopyLoader, 'merge', 'db_write')
+
+        started = time.perf_counter()
+        try:
+            if scenario['target'] == 'batch_upsert_products':
+                # Rows are read and normalized up front; only the upsert is measured end to end
+                rows = [
+                    CSVValidator.normalize_row(row) for row in CSVReader(scenario['filepath'])
+                    if CSVValidator.validate_row(row, 0)[0]
+                ]
+                started = time.perf_counter()
+                timer.totals = {stage: 0.0 for stage in STAGES}
+                result = DatabaseHelper.batch_upsert_products(rows)
+                result.setdefault('errors', generated['errors'])
+            else:
+                result = process_csv_file(
+                    scenario['filepath'], 'benchmark', NullTracker(),
+                    engine=scenario['engine'],
+                    columnar=scenario['mode'] == 'columnar',
+                    pipeline=scenario['pipeline'],
+                    dedupe=scenario['dedupe']
+                )
+        finally:
+            timer.restore()
+        elapsed = time.perf_counter() - started
+
+        stages = dict(timer.totals)
+        # Reading, decoding and CSV parsing are whatever the wrapped stages do not cover
+        stages['decode'] = max(elapsed - sum(v for k, v in stages.items() if k != 'decode'), 0.0)
+
+        products = db.session.query(Product).count()
+        dialect = db.engine.dialect.name
+        db.session.remove()
+
+    os.remove(scenario['filepath'])
+
+    return {
+        **{k: v for k, v in scenario.items() if k != 'filepath'},
+        'database': dialect,
+        'file_bytes': file_size,
+        'generated_duplicates': generated['duplicates'],
+        'generated_errors': generated['errors'],
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(scenario['rows'] / elapsed) if elapsed > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': {stage: round(stages[stage], 3) for stage in STAGES},
+        'result': {k: v for k, v in result.items() if isinstance(v, (int, float))},
+        'products': products
+    }
+
+def build_scenarios(args) -> list:
+    scenarios = []
+    combinations = itertools.product(
+        args.target, args.rows, args.encodings, args.duplicate_rates, args.error_rates, args.modes
+    )
+    for target, rows, encoding, duplicate_rate, error_rate, mode in combinations:
+        if target == 'batch_upsert_products' and mode != args.modes[0]:
+            continue
+        scenarios.append({
+            'target': target,
+            'rows': rows,
+            'encoding': encoding,
+            'duplicate_rate': duplicate_rate,
+            'error_rate': error_rate,
+            'mode': mode if target == 'process_csv_file' else None,
+            'engine': args.engine,
+            'pipeline': args.pipeline,
+            'dedupe': args.dedupe,
+            'seed': args.seed
+        })
+    return scenarios
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def csv_list(cast):
+    return lambda value: [cast(item) for item in value.split(',') if item]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark CSV import throughput on synthetic catalogs.')
+    parser.add_argument('--rows', type=csv_list(int), default=[10000], help='comma-separated catalog sizes')
+    parser.add_argument('--encodings', type=csv_list(str), default=['utf-8'], help='e.g. utf-8,latin-1,utf-16')
+    parser.add_argument('--duplicate-rates', type=csv_list(float), default=[0.0])
+    parser.add_argument('--error-rates', type=csv_list(float), default=[0.0])
+    parser.add_argument('--modes', type=csv_list(str), default=['rows'], help='rows and/or columnar')
+    parser.add_argument('--target', type=csv_list(str), default=['process_csv_file'],
+                        help='process_csv_file and/or batch_upsert_products')
+    parser.add_argument('--engine', choices=['values', 'copy'], default='values')
+    parser.add_argument('--pipeline', action='store_true')
+    parser.add_argument('--dedupe', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url', help='PostgreSQL URL to benchmark against instead of in-memory SQLite')
+    parser.add_argument('--output', help='JSON results path (default: benchmarks/results/import-<timestamp>.json)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database_url:
+        os.environ['BENCHMARK_DATABASE_URL'] = args.database_url
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix='acme-bench-')
+    context = multiprocessing.get_context('spawn')
+
+    for number, scenario in enumerate(build_scenarios(args)):
+        scenario['filepath'] = os.path.join(workdir, f'catalog-{number}.csv')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            measured = executor.submit(run_scenario, scenario).result()
+        results.append(measured)
+
+        stages = ' '.join(f"{stage}={measured['stages'][stage]:.2f}s" for stage in STAGES)
+        print(
+            f"{measured['target']:<22} {measured['mode'] or '-':<9} {measured['rows']:>9} rows "
+            f"{measured['encoding']:<8} dup={measured['duplicate_rate']:<5} err={measured['error_rate']:<5} "
+            f"{measured['rows_per_second']:>9} rows/s  rss={measured['peak_rss_mb']}MB  {stages}"
+        )
+
+    os.rmdir(workdir)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'results',
+        f"import-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'created_at': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
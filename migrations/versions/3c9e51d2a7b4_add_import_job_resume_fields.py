@@ -0,0 +1,30 @@
+"""Add filepath, options and checkpoint to import jobs
+
+Revision ID: 3c9e51d2a7b4
+Revises: fa27f172aa6d
+Create Date: 2026-10-18 09:12:41.208115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e51d2a7b4'
+down_revision = 'fa27f172aa6d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('filepath', sa.String(length=1000), nullable=True))
+        batch_op.add_column(sa.Column('options', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('checkpoint')
+        batch_op.drop_column('options')
+        batch_op.drop_column('filepath')
@@ -0,0 +1,26 @@
+"""Add products (created_at, id) index for keyset pagination
+
+Revision ID: 4f1c8e92b7d3
+Revises: e2a6d08f93c1
+Create Date: 2026-10-18 13:02:47.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c8e92b7d3'
+down_revision = 'e2a6d08f93c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_created_at_id')
@@ -0,0 +1,26 @@
+"""Add deleted count to import jobs
+
+Revision ID: 5e8b1d7c3a40
+Revises: c6e0b4d19a27
+Create Date: 2026-10-18 16:12:08.441920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1d7c3a40'
+down_revision = 'c6e0b4d19a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('deleted_count')
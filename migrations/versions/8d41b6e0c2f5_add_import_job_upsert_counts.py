@@ -0,0 +1,30 @@
+"""Add inserted, updated and unchanged counts to import jobs
+
+Revision ID: 8d41b6e0c2f5
+Revises: 3c9e51d2a7b4
+Create Date: 2026-10-18 10:03:17.554210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e0c2f5'
+down_revision = '3c9e51d2a7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('inserted_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('updated_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('unchanged_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('unchanged_count')
+        batch_op.drop_column('updated_count')
+        batch_op.drop_column('inserted_count')
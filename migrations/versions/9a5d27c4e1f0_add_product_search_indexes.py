@@ -0,0 +1,41 @@
+"""Add trigram and full-text search indexes on products
+
+Revision ID: 9a5d27c4e1f0
+Revises: 4f1c8e92b7d3
+Create Date: 2026-10-18 13:41:12.806539
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5d27c4e1f0'
+down_revision = '4f1c8e92b7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL only: other databases keep scanning for searches
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Serve the name/description ILIKE '%term%' filters
+    op.execute('CREATE INDEX ix_products_name_trgm ON products USING gin (name gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_products_description_trgm ON products USING gin (description gin_trgm_ops)')
+    # Must match ProductService.search_document() exactly to be used
+    op.execute(
+        "CREATE INDEX ix_products_search ON products USING gin "
+        "(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('DROP INDEX IF EXISTS ix_products_search')
+    op.execute('DROP INDEX IF EXISTS ix_products_description_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_products_name_trgm')
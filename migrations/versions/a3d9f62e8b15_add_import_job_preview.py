@@ -0,0 +1,26 @@
+"""Add dry-run preview to import jobs
+
+Revision ID: a3d9f62e8b15
+Revises: 5e8b1d7c3a40
+Create Date: 2026-10-18 17:03:45.208116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d9f62e8b15'
+down_revision = '5e8b1d7c3a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('preview', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('preview')
@@ -0,0 +1,26 @@
+"""Add duplicate count to import jobs
+
+Revision ID: b7f3a9c41e68
+Revises: 8d41b6e0c2f5
+Create Date: 2026-10-18 10:41:52.017384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f3a9c41e68'
+down_revision = '8d41b6e0c2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duplicate_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('duplicate_count')
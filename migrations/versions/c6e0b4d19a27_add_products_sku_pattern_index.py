@@ -0,0 +1,31 @@
+"""Add products LOWER(sku) text_pattern_ops index for SKU prefix lookups
+
+Revision ID: c6e0b4d19a27
+Revises: 9a5d27c4e1f0
+Create Date: 2026-10-18 14:15:33.274016
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e0b4d19a27'
+down_revision = '9a5d27c4e1f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ix_products_sku_lower cannot serve LIKE 'abc%' under non-C collations; this one can
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('CREATE INDEX ix_products_sku_lower_pattern ON products (LOWER(sku) text_pattern_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('DROP INDEX IF EXISTS ix_products_sku_lower_pattern')
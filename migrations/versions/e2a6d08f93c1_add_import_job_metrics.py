@@ -0,0 +1,26 @@
+"""Add metrics to import jobs
+
+Revision ID: e2a6d08f93c1
+Revises: b7f3a9c41e68
+Create Date: 2026-10-18 11:26:05.391847
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6d08f93c1'
+down_revision = 'b7f3a9c41e68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('metrics', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('metrics')
@@ -1,7 +1,9 @@
 import pytest
+from sqlalchemy.exc import OperationalError
 from app.utils.csv_validator import CSVValidator
 from app.utils.db_helper import DatabaseHelper
 from app.models.product import Product
+from app.extensions import db
 
 def test_csv_validator_valid_row():
     row = {'sku': 'TEST1', 'name': 'Test Product', 'price': '10.00', 'active': 'true'}
@@ -42,8 +44,723 @@ def test_batch_upsert_products(app):
     ]
     result = DatabaseHelper.batch_upsert_products(updated_products)
     assert result['processed'] == 1
-    assert result['updated'] == 0 # Implementation currently returns 0 for updated
+    assert result['updated'] == 1
+    assert result['inserted'] == 0
     
     p1_updated = Product.query.filter_by(sku='SKU1').first()
     assert p1_updated.name == 'Product 1 Updated'
     assert p1_updated.price == 15.0
+
+def test_batch_upsert_skips_unchanged_rows(app):
+    products = [
+        {'sku': 'SAME1', 'name': 'Same', 'description': 'Desc', 'price': 10.0, 'active': True},
+        {'sku': 'EDIT1', 'name': 'Before', 'description': 'Desc', 'price': 20.0, 'active': True}
+    ]
+    DatabaseHelper.batch_upsert_products(products)
+    untouched_at = Product.query.filter_by(sku='SAME1').first().updated_at
+    
+    result = DatabaseHelper.batch_upsert_products([
+        {'sku': 'same1', 'name': 'Same', 'description': 'Desc', 'price': 10.0, 'active': True},
+        {'sku': 'EDIT1', 'name': 'After', 'description': 'Desc', 'price': 20.0, 'active': True},
+        {'sku': 'NEW1', 'name': 'New', 'description': '', 'price': 5.0, 'active': True}
+    ])
+    assert result == {'processed': 3, 'inserted': 1, 'updated': 1, 'unchanged': 1}
+    
+    db.session.expire_all()
+    assert Product.query.filter_by(sku='SAME1').first().updated_at == untouched_at
+    assert Product.query.filter_by(sku='EDIT1').first().name == 'After'
+
+def test_process_csv_file_copy_engine_falls_back_on_sqlite(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("sku,name,price\nCOPY1,Copy Product,5.00\nCOPY2,Other Product,7.50\n")
+    
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), engine='copy')
+    assert result['processed'] == 2
+    assert result['success'] == 2
+    assert result['inserted'] == 2
+    assert Product.query.count() == 2
+
+def test_import_options_rejects_unknown_engine():
+    from app.services.import_service import ImportService
+    
+    assert ImportService.get_import_options({'engine': 'COPY'}) == {'engine': 'copy'}
+    with pytest.raises(ValueError):
+        ImportService.get_import_options({'engine': 'bulk'})
+
+def test_csv_reader_single_pass_tracks_bytes(tmp_path):
+    from app.utils.csv_reader import CSVReader
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_bytes('\ufeffSKU, Name ,Description\nA1,Caf\u00e9,"multi\nline"\r\nA2,Tea,\n'.encode('utf-8'))
+    
+    reader = CSVReader(str(csv_file))
+    rows = list(reader)
+    
+    assert reader.headers == ['sku', 'name', 'description']
+    assert [r['sku'] for r in rows] == ['A1', 'A2']
+    assert rows[0]['name'] == 'Caf\u00e9'
+    assert rows[0]['description'] == 'multi\nline'
+    assert reader.rows_read == 2
+    assert reader.bytes_read == reader.file_size
+    assert reader.progress() == 1.0
+
+def test_csv_reader_utf16(tmp_path):
+    from app.utils.csv_reader import CSVReader
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_bytes('sku,name\nU1,\u00dcber\nU2,Zw\u00f6lf\n'.encode('utf-16'))
+    
+    reader = CSVReader(str(csv_file))
+    rows = list(reader)
+    
+    assert reader.encoding.lower().startswith('utf-16')
+    assert [r['name'] for r in rows] == ['\u00dcber', 'Zw\u00f6lf']
+    assert reader.progress() == 1.0
+
+def test_csv_reader_utf16_rows_across_chunks(tmp_path):
+    from app.utils.csv_reader import CSVReader
+    
+    lines = ['sku,name,price']
+    lines += [f'SKU-{i},Name number {i} with some padding,{i}.00' for i in range(20000)]
+    lines.insert(5000, '"ML-1","Two\r\nlines \u2028 and \x1c kept",1.00')
+    csv_file = tmp_path / 'products.csv'
+    data = ('\r\n'.join(lines) + '\r\n').encode('utf-16')
+    assert len(data) > 2 * CSVReader.CHUNK_SIZE
+    csv_file.write_bytes(data)
+    
+    reader = CSVReader(str(csv_file))
+    rows = list(reader)
+    
+    assert len(rows) == 20001
+    assert all(row['price'] for row in rows)
+    assert rows[4999]['name'] == 'Two\r\nlines \u2028 and \x1c kept'
+    assert rows[-1] == {'sku': 'SKU-19999', 'name': 'Name number 19999 with some padding', 'price': '19999.00'}
+
+def test_csv_reader_split_keeps_quoted_newlines_together(tmp_path):
+    from app.utils.csv_reader import CSVReader
+    
+    lines = ['sku,name,description']
+    for i in range(200):
+        description = '"spans\nlines"' if i % 3 == 0 else 'plain'
+        lines.append(f'S{i},Name {i},{description}')
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text('\n'.join(lines) + '\n')
+    
+    reader = CSVReader(str(csv_file))
+    ranges = reader.split(5)
+    assert len(ranges) == 5
+    
+    skus = []
+    for start, end in ranges:
+        chunk = CSVReader(str(csv_file), encoding=reader.encoding, headers=reader.headers, start=start, end=end)
+        skus.extend(row['sku'] for row in chunk)
+    assert skus == [f'S{i}' for i in range(200)]
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_chunk_errors_carry_file_row_numbers(app, tmp_path, mocker, columnar):
+    from app.tasks.csv_import import process_csv_file
+    from app.utils.csv_reader import CSVReader
+    
+    lines = ['sku,name,description,price']
+    for i in range(1, 301):
+        description = '"spans\nlines"' if i % 7 == 0 else 'plain'
+        price = 'bad' if i in (50, 170, 290) else '1.00'
+        lines.append(f'S{i},Name {i},{description},{price}')
+        if i == 120:
+            lines.append('')
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text('\n'.join(lines) + '\n')
+    
+    def errors(**kwargs):
+        tracker = mocker.Mock()
+        process_csv_file(str(csv_file), 'job-id', tracker, columnar=columnar, **kwargs)
+        return [
+            c.args[3] for c in tracker.publish_progress.call_args_list
+            if c.args[3].startswith('Validation error')
+        ]
+    
+    expected = errors()
+    assert expected == [
+        'Validation error: Row 50: Invalid price format',
+        'Validation error: Row 170: Invalid price format',
+        'Validation error: Row 290: Invalid price format'
+    ]
+    
+    splitter = CSVReader(str(csv_file))
+    ranges = splitter.split(4)
+    assert len(ranges) == 4
+    chunked = []
+    for (start, end), row_offset in zip(ranges, splitter.range_rows):
+        reader = CSVReader(str(csv_file), encoding=splitter.encoding, headers=splitter.headers, start=start, end=end)
+        chunked += errors(reader=reader, row_offset=row_offset)
+    assert chunked == expected
+
+def test_parallel_import_falls_back_to_sequential_on_sqlite(app, tmp_path, mocker):
+    from app.services.import_service import ImportService
+    from app.tasks.csv_import import process_csv_import
+    
+    mocker.patch('app.tasks.csv_import.ProgressTracker')
+    mocker.patch('app.services.webhook_service.WebhookService.trigger_webhooks')
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("sku,name,price\nPAR1,Parallel,1.00\npar1,Parallel Again,2.00\n")
+    job = ImportService.create_import_job('products.csv')
+    
+    result = process_csv_import(job.id, str(csv_file), {'parallel': True, 'chunks': 2})
+    assert result['status'] == 'SUCCESS'
+    assert result['processed'] == 2
+    assert Product.query.count() == 1
+    
+    db.session.expire_all()
+    assert ImportService.get_job(job.id).status == 'SUCCESS'
+
+def test_failed_chunk_takes_its_progress_back_before_retrying(app, tmp_path, mocker):
+    from app.tasks import parallel_import
+    
+    tracker = mocker.patch.object(parallel_import, 'ProgressTracker').return_value
+    tracker.increment_counters.return_value = {}
+    mocker.patch.object(parallel_import, 'CopyLoader')
+    mocker.patch.object(parallel_import.process_csv_chunk, 'retry', side_effect=RuntimeError('retrying'))
+    
+    def fail_midway(*args, on_batch, **kwargs):
+        on_batch(400, mocker.Mock(bytes_read=9000))
+        raise OperationalError('COPY', {}, Exception('connection lost'))
+    mocker.patch('app.tasks.csv_import.process_csv_file', side_effect=fail_midway)
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("sku,name,price\n")
+    with pytest.raises(RuntimeError, match='retrying'):
+        parallel_import.process_csv_chunk.run(
+            'job-id', str(csv_file), 0, 1000, 20000, 'utf-8', ['sku', 'name', 'price'], 'staging', 20000
+        )
+    
+    increments = [c.kwargs for c in tracker.increment_counters.call_args_list]
+    assert increments == [{'processed': 400, 'bytes': 8000}, {'processed': -400, 'bytes': -8000}]
+
+def test_failed_chunk_is_not_retried_for_other_errors(app, tmp_path, mocker):
+    from app.tasks import parallel_import
+    
+    tracker = mocker.patch.object(parallel_import, 'ProgressTracker').return_value
+    tracker.increment_counters.return_value = {}
+    mocker.patch.object(parallel_import, 'CopyLoader')
+    retry = mocker.patch.object(parallel_import.process_csv_chunk, 'retry')
+    
+    def fail_midway(*args, on_batch, **kwargs):
+        on_batch(400, mocker.Mock(bytes_read=9000))
+        raise ValueError('bad data')
+    mocker.patch('app.tasks.csv_import.process_csv_file', side_effect=fail_midway)
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("sku,name,price\n")
+    with pytest.raises(ValueError, match='bad data'):
+        parallel_import.process_csv_chunk.run(
+            'job-id', str(csv_file), 0, 1000, 20000, 'utf-8', ['sku', 'name', 'price'], 'staging', 20000
+        )
+    
+    retry.assert_not_called()
+    increments = [c.kwargs for c in tracker.increment_counters.call_args_list]
+    assert increments == [{'processed': 400, 'bytes': 8000}, {'processed': -400, 'bytes': -8000}]
+
+def test_validate_frame_matches_row_validation():
+    import pandas as pd
+    
+    rows = [
+        {'sku': 'OK1', 'name': 'Fine', 'price': ' 2.50 ', 'active': 'Yes'},
+        {'sku': ' ', 'name': 'No SKU', 'price': '1', 'active': ''},
+        {'sku': 'NONAME', 'name': '', 'price': 'abc', 'active': 'true'},
+        {'sku': 'BADPRICE', 'name': 'Bad', 'price': 'abc', 'active': 'true'},
+        {'sku': 'NEG', 'name': 'Negative', 'price': '-1', 'active': 'true'},
+        {'sku': 'X' * 256, 'name': 'Long SKU', 'price': '', 'active': 'no'},
+        {'sku': 'LONGNAME', 'name': 'N' * 501, 'price': '1', 'active': 'true'},
+        {'sku': 'UNDERSCORE', 'name': 'Python float syntax', 'price': '1_000', 'active': 'active'},
+    ]
+    frame = pd.DataFrame(rows, dtype=str)
+    
+    normalized, errors = CSVValidator.validate_frame(frame, first_row_number=11)
+    
+    expected_errors = []
+    expected_rows = []
+    for row_number, row in enumerate(rows, start=11):
+        is_valid, error = CSVValidator.validate_row(row, row_number)
+        if is_valid:
+            expected_rows.append(CSVValidator.normalize_row(row))
+        else:
+            expected_errors.append(error)
+    
+    assert errors == expected_errors
+    assert normalized.to_dict('records') == expected_rows
+
+def test_process_csv_file_columnar(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("SKU,Name,Price,Active\nCOL1,First,1.00,true\nCOL2,,2.00,true\ncol1,First Again,3.00,false\n")
+    
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), columnar=True)
+    assert result['processed'] == 3
+    assert result['errors'] == 1
+    
+    product = DatabaseHelper.get_product_by_sku('COL1')
+    assert product.name == 'First Again'
+    assert not product.active
+
+def test_process_csv_file_pipeline(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    lines = ['sku,name,price'] + [f'PIPE{i},Product {i},{i}.00' for i in range(2500)]
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text('\n'.join(lines) + '\n')
+    
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), pipeline=True, queue_depth=1)
+    assert result['processed'] == 2500
+    assert result['success'] == 2500
+    assert result['pipeline']['batches'] == 3
+    assert result['pipeline']['bottleneck'] in ('database', 'parser')
+    assert Product.query.count() == 2500
+
+def test_pipeline_reports_progress_of_each_batch(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    lines = ['sku,name,price'] + [f'SNAP{i},Product {i},{i}.00' for i in range(3500)]
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text('\n'.join(lines) + '\n')
+    
+    seen = []
+    process_csv_file(str(csv_file), 'job-id', mocker.Mock(), pipeline=True, queue_depth=2,
+                     on_batch=lambda processed, reader: seen.append((processed, reader.rows_read, reader.progress())))
+    
+    # The producer runs ahead, but each batch reports where the reader was when it was produced
+    assert [(processed, rows) for processed, rows, _ in seen] == [(1000, 1000), (2000, 2000), (3000, 3000), (3500, 3500)]
+    assert [fraction for _, _, fraction in seen] == sorted(fraction for _, _, fraction in seen)
+    assert seen[0][2] < 0.5
+
+def test_import_pipeline_propagates_producer_errors():
+    from app.utils.import_pipeline import ImportPipeline
+    
+    def source():
+        yield 1
+        raise ValueError('broken row')
+    
+    consumed = []
+    with pytest.raises(ValueError, match='broken row'):
+        for item in ImportPipeline(source(), queue_depth=1):
+            consumed.append(item)
+    assert consumed == [1]
+
+def test_process_csv_file_resumes_from_checkpoint(app, tmp_path, mocker):
+    from app.services.import_service import ImportService
+    from app.tasks.csv_import import process_csv_file
+    
+    lines = ['sku,name,price'] + [f'RES{i},Product {i},1.00' for i in range(2500)]
+    lines[1500] = 'RES1499,,1.00'
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text('\n'.join(lines) + '\n')
+    job = ImportService.create_import_job('products.csv', filepath=str(csv_file))
+    
+    upsert = DatabaseHelper.batch_upsert_products
+    calls = {'count': 0}
+    
+    def failing_upsert(rows, **kwargs):
+        calls['count'] += 1
+        if calls['count'] == 2:
+            raise RuntimeError('database went away')
+        return upsert(rows, **kwargs)
+    
+    patched = mocker.patch.object(DatabaseHelper, 'batch_upsert_products', side_effect=failing_upsert)
+    with pytest.raises(RuntimeError):
+        process_csv_file(str(csv_file), job.id, mocker.Mock())
+    mocker.stop(patched)
+    
+    checkpoint = ImportService.get_job(job.id).checkpoint
+    assert checkpoint['row'] == 1000
+    assert Product.query.count() == 1000
+    
+    result = process_csv_file(str(csv_file), job.id, mocker.Mock(), resume_from=checkpoint)
+    assert result['processed'] == 2500
+    assert result['errors'] == 1
+    assert result['success'] == 2499
+    assert Product.query.count() == 2499
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_process_csv_file_dedupes_across_batches(app, tmp_path, mocker, columnar):
+    from app.tasks.csv_import import process_csv_file
+    
+    lines = ["sku,name,price"]
+    lines += [f"DUP-{i % 500},Name {i},{i}.00" for i in range(1500)]
+    # An invalid last occurrence must not hide the valid one before it
+    lines.append("dup-0,,1.00")
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("\n".join(lines) + "\n")
+    
+    app.config['IMPORT_FRAME_ROWS'] = 400
+    write = mocker.spy(DatabaseHelper, '_execute_upsert_batch')
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), columnar=columnar, dedupe=True)
+    
+    assert result['processed'] == 1501
+    assert result['errors'] == 1
+    assert result['duplicates'] == 1000
+    assert result['success'] == 500
+    assert result['inserted'] == 500
+    assert sum(len(call.args[0]) for call in write.call_args_list) == 500
+    assert Product.query.count() == 500
+    assert Product.query.filter_by(sku='DUP-0').first().name == 'Name 1000'
+
+def test_benchmark_catalog_matches_requested_errors_and_duplicates(app, tmp_path, mocker):
+    from benchmarks.generate import generate_catalog
+    from app.tasks.csv_import import process_csv_file
+    
+    csv_file = tmp_path / 'catalog.csv'
+    generated = generate_catalog(str(csv_file), 2000, encoding='latin-1', duplicate_rate=0.1, error_rate=0.05)
+    assert generated['duplicates'] > 0 and generated['errors'] > 0
+    
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), dedupe=True)
+    assert result['processed'] == 2000
+    assert result['errors'] == generated['errors']
+    assert result['success'] + result['duplicates'] == 2000 - generated['errors']
+
+def test_benchmark_stage_timer_wraps_loader_methods():
+    from benchmarks.run_import import StageTimer
+    from app.utils.copy_loader import CopyLoader
+    
+    original = CopyLoader.__dict__['copy_rows']
+    loader = CopyLoader.__new__(CopyLoader)
+    loader.seq_start = loader.staged = 0
+    
+    timer = StageTimer()
+    timer.wrap(CopyLoader, 'copy_rows', 'db_write')
+    try:
+        assert loader.copy_rows([]) == 0
+    finally:
+        timer.restore()
+    
+    assert timer.totals['db_write'] > 0
+    assert CopyLoader.__dict__['copy_rows'] is original
+
+def test_process_csv_file_records_stage_metrics(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    lines = ["sku,name,price"] + [f"MET-{i},Metric {i},{i}.00" for i in range(2500)]
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("\n".join(lines) + "\n")
+    
+    tracker = mocker.Mock()
+    result = process_csv_file(str(csv_file), 'job-id', tracker)
+    
+    metrics = result['metrics']
+    assert metrics['rows'] == 2500
+    assert set(metrics['stages']) >= {'detect_encoding', 'parse', 'validate', 'normalize', 'upsert', 'commit'}
+    assert all(seconds >= 0 for seconds in metrics['stages'].values())
+    
+    progress_events = [call.kwargs for call in tracker.publish_progress.call_args_list if 'processed' in call.kwargs]
+    assert len(progress_events) == 3
+    assert all('rows_per_second' in event and 'eta_seconds' in event for event in progress_events)
+    assert progress_events[-1]['eta_seconds'] == 0
+
+def test_process_csv_file_follows_growing_spool(app, tmp_path, mocker):
+    import threading
+    import time
+    from app.tasks.csv_import import process_csv_file
+    from app.utils.spool import UploadSpool
+    
+    mocker.patch.object(UploadSpool, 'POLL_INTERVAL', 0.01)
+    spool = tmp_path / 'spool.csv'
+    spool.write_bytes(b'')
+    
+    rows = [f"TAIL-{i},Tail {i},{i}.00\n".encode() for i in range(2500)]
+    
+    class SlowBody:
+        # Yields the CSV in small pieces, cutting rows in half, like a slow client
+        def __init__(self):
+            self.data = b"sku,name,price\n" + b"".join(rows)
+            self.position = 0
+        
+        def read(self, size):
+            time.sleep(0.001)
+            chunk = self.data[self.position:self.position + 997]
+            self.position += len(chunk)
+            return chunk
+    
+    writer = threading.Thread(target=UploadSpool.write, args=(SlowBody(), str(spool)))
+    writer.start()
+    try:
+        result = process_csv_file(str(spool), 'job-id', mocker.Mock(), follow=True)
+    finally:
+        writer.join()
+    
+    assert result['processed'] == 2500
+    assert result['success'] == 2500
+    assert Product.query.count() == 2500
+
+def test_follow_reader_fails_on_aborted_upload(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    from app.utils.spool import UploadSpool
+    
+    spool = tmp_path / 'spool.csv'
+    spool.write_bytes(b"sku,name,price\nABORT-1,Partial")
+    (tmp_path / 'spool.csv.aborted').write_bytes(b'')
+    
+    with pytest.raises(IOError, match='aborted'):
+        process_csv_file(str(spool), 'job-id', mocker.Mock(), follow=True)
+
+def write_compressed(path, data: bytes, compression: str):
+    import gzip
+    import zipfile
+    if compression == 'gzip':
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+    elif compression == 'zstd':
+        zstandard = pytest.importorskip('zstandard')
+        path.write_bytes(zstandard.ZstdCompressor().compress(data))
+    else:
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('catalog.csv', data)
+
+@pytest.mark.parametrize('suffix,compression', [('.csv.gz', 'gzip'), ('.csv.zst', 'zstd'), ('.zip', 'zip')])
+@pytest.mark.parametrize('columnar', [False, True])
+def test_process_csv_file_reads_compressed_uploads(app, tmp_path, mocker, suffix, compression, columnar):
+    from app.tasks.csv_import import process_csv_file
+    from app.utils.csv_reader import CSVReader
+    
+    lines = ["sku,name,price"] + [f"GZ-{i},Café {i},{i}.00" for i in range(3000)]
+    path = tmp_path / f'products{suffix}'
+    write_compressed(path, ("\n".join(lines) + "\n").encode('latin-1'), compression)
+    
+    tracker = mocker.Mock()
+    result = process_csv_file(str(path), 'job-id', tracker, columnar=columnar)
+    
+    assert result['processed'] == 3000
+    assert result['success'] == 3000
+    assert Product.query.filter_by(sku='GZ-7').first().name == 'Café 7'
+    
+    reader = CSVReader(str(path))
+    assert sum(1 for _ in reader) == 3000
+    assert reader.progress() == 1.0
+    # Not split, and the compressed bytes are never sniffed as CSV
+    unsplit = CSVReader(str(path))
+    assert unsplit.split(4) == []
+    assert unsplit.encoding is None
+
+def test_is_valid_file_accepts_compressed_csv():
+    from app.services.import_service import ImportService
+    
+    for name in ('a.csv', 'A.CSV.GZ', 'a.csv.zst', 'a.zip'):
+        assert ImportService.is_valid_file(name)
+    for name in ('a.gz', 'a.txt', 'csv'):
+        assert not ImportService.is_valid_file(name)
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_process_csv_file_imports_ndjson(app, tmp_path, mocker, columnar):
+    import json
+    from app.tasks.csv_import import process_csv_file
+    
+    records = [{'SKU': f'ND-{i}', 'Name': f'Line\n{i}', 'price': i + 0.5, 'active': i % 2 == 0} for i in range(1200)]
+    lines = [json.dumps(record) for record in records] + ['{not json', '[1, 2]', json.dumps({'sku': 'ND-X', 'price': -1})]
+    path = tmp_path / 'products.ndjson'
+    path.write_text("\n".join(lines) + "\n")
+    
+    result = process_csv_file(str(path), 'job-id', mocker.Mock(), columnar=columnar)
+    
+    assert result['processed'] == 1203
+    assert result['success'] == 1200
+    assert result['errors'] == 3
+    product = Product.query.filter_by(sku='ND-3').first()
+    assert product.name == 'Line\n3'
+    assert float(product.price) == 3.5
+    assert product.active is False
+
+def test_ndjson_reader_splits_on_every_newline(tmp_path):
+    import json
+    from app.utils.ndjson_reader import NDJSONReader
+    
+    path = tmp_path / 'products.jsonl'
+    path.write_text("".join(json.dumps({'sku': f'S{i}', 'name': 'say "hi"'}) + "\n" for i in range(1000)))
+    
+    ranges = NDJSONReader(str(path)).split(4)
+    assert len(ranges) == 4
+    rows = [row for start, end in ranges for row in NDJSONReader(str(path), start=start, end=end)]
+    assert [row['sku'] for row in rows] == [f'S{i}' for i in range(1000)]
+
+def test_validate_frame_typed_columns_match_row_path():
+    import pandas as pd
+    from app.utils.import_reader import ImportReader
+    
+    frame = pd.DataFrame({
+        'sku': ['T1', 'T2', 'T3', 'T4'],
+        'name': ['A', 'B', '', 'D'],
+        'price': [1.25, float('nan'), 3.0, -2.0],
+        'active': [True, False, True, True]
+    })
+    normalized, errors = CSVValidator.validate_frame(frame)
+    
+    expected_rows, expected_errors = [], []
+    for row_number, record in enumerate(frame.to_dict('records'), start=1):
+        row = {key: ImportReader.to_cell(value) for key, value in record.items()}
+        is_valid, error = CSVValidator.validate_row(row, row_number)
+        if is_valid:
+            expected_rows.append(CSVValidator.normalize_row(row))
+        else:
+            expected_errors.append(error)
+    
+    assert errors == expected_errors
+    assert normalized.to_dict('records') == expected_rows
+
+def test_detect_format_prefers_magic_bytes():
+    from app.utils.import_reader import ImportReader
+    from app.utils.ndjson_reader import NDJSONReader
+    
+    assert ImportReader.detect_format('catalog.parquet') == 'parquet'
+    assert ImportReader.detect_format('catalog.jsonl.gz') == 'ndjson'
+    assert ImportReader.detect_format('catalog.csv.gz') == 'csv'
+    assert ImportReader.detect_format('export.bin', b'PAR1\x15\x04') == 'parquet'
+    assert ImportReader.detect_format('export.bin') is None
+    assert ImportReader.for_file('catalog.ndjson.zst') is NDJSONReader
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_process_csv_file_imports_parquet(app, tmp_path, mocker, columnar):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    from app.tasks.csv_import import process_csv_file
+    
+    table = pa.table({
+        'SKU': [f'PQ-{i}' for i in range(500)],
+        'name': [f'Parquet {i}' for i in range(500)],
+        'price': [float(i) for i in range(500)],
+        'active': [i % 3 != 0 for i in range(500)]
+    })
+    path = tmp_path / 'products.parquet'
+    pq.write_table(table, str(path), row_group_size=128)
+    
+    result = process_csv_file(str(path), 'job-id', mocker.Mock(), columnar=columnar)
+    
+    assert result['processed'] == 500
+    assert result['success'] == 500
+    assert Product.query.filter_by(sku='PQ-3').first().active is False
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_process_csv_file_replaces_catalog(app, tmp_path, mocker, columnar):
+    from app.tasks.csv_import import process_csv_file
+    
+    DatabaseHelper.batch_upsert_products([
+        {'sku': 'KEEP-1', 'name': 'Keep', 'description': '', 'price': 1.0, 'active': True},
+        {'sku': 'EDIT-1', 'name': 'Old name', 'description': '', 'price': 2.0, 'active': True},
+        {'sku': 'GONE-1', 'name': 'Gone', 'description': '', 'price': 3.0, 'active': True}
+    ])
+    kept = Product.query.filter_by(sku='KEEP-1').first()
+    kept_id, kept_updated_at = kept.id, kept.updated_at
+    edited_id = Product.query.filter_by(sku='EDIT-1').first().id
+    
+    csv_file = tmp_path / 'catalog.csv'
+    csv_file.write_text(
+        "sku,name,description,price,active\n"
+        "keep-1,Keep,,1.00,true\n"
+        "EDIT-1,First name,,2.00,true\n"
+        "NEW-1,New,,4.00,true\n"
+        "EDIT-1,New name,,2.00,true\n"
+    )
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), columnar=columnar, replace=True)
+    db.session.expire_all()
+    
+    assert result['inserted'] == 1
+    assert result['updated'] == 1
+    assert result['unchanged'] == 1
+    assert result['deleted'] == 1
+    assert {p.sku for p in Product.query.all()} == {'KEEP-1', 'EDIT-1', 'NEW-1'}
+    kept = Product.query.filter_by(sku='KEEP-1').first()
+    assert (kept.id, kept.updated_at) == (kept_id, kept_updated_at)
+    edited = Product.query.filter_by(sku='EDIT-1').first()
+    assert (edited.id, edited.name) == (edited_id, 'New name')
+
+def test_import_options_replace():
+    from app.services.import_service import ImportService
+    
+    assert ImportService.get_import_options({'replace': 'true'})['replace'] is True
+    assert 'replace' not in ImportService.get_import_options({})
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_process_csv_file_imports_arrow_ipc(app, tmp_path, mocker, stream):
+    pa = pytest.importorskip('pyarrow')
+    from app.tasks.csv_import import process_csv_file
+    
+    table = pa.table({
+        'sku': [f'IPC-{i}' for i in range(300)],
+        'name': [f'Arrow {i}' for i in range(300)],
+        'price': [i + 0.5 for i in range(300)]
+    })
+    path = tmp_path / 'products.arrow'
+    with pa.OSFile(str(path), 'wb') as sink:
+        open_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+        with open_writer(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=100)
+    
+    result = process_csv_file(str(path), 'job-id', mocker.Mock(), columnar=True)
+    
+    assert result['success'] == 300
+    assert float(Product.query.filter_by(sku='IPC-7').first().price) == 7.5
+
+@pytest.mark.parametrize('replace', [False, True])
+def test_process_csv_file_dry_run_writes_nothing(app, tmp_path, mocker, replace):
+    from app.tasks.csv_import import process_csv_file
+    
+    DatabaseHelper.batch_upsert_products([
+        {'sku': 'KEEP-1', 'name': 'Keep', 'description': '', 'price': 1.0, 'active': True},
+        {'sku': 'EDIT-1', 'name': 'Edit', 'description': '', 'price': 2.0, 'active': True},
+        {'sku': 'GONE-1', 'name': 'Gone', 'description': '', 'price': 3.0, 'active': True}
+    ])
+    before = {p.sku: (p.name, p.price, p.updated_at) for p in Product.query.all()}
+    
+    csv_file = tmp_path / 'catalog.csv'
+    csv_file.write_text(
+        "sku,name,description,price,active\n"
+        "keep-1,Keep,,1.00,true\n"
+        "EDIT-1,Edit,,2.50,false\n"
+        "NEW-1,New,,4.00,true\n"
+        "BAD-1,,,1.00,true\n"
+    )
+    result = process_csv_file(str(csv_file), 'job-id', mocker.Mock(), dry_run=True, replace=replace)
+    db.session.expire_all()
+    
+    preview = result['preview']
+    assert (preview['inserted'], preview['updated'], preview['unchanged']) == (1, 1, 1)
+    assert preview['deleted'] == (1 if replace else 0)
+    assert preview['rejected'] == 1
+    assert preview['sample']['inserted'] == [
+        {'sku': 'NEW-1', 'name': 'New', 'description': '', 'price': 4.0, 'active': True}
+    ]
+    assert preview['sample']['updated'][0]['sku'] == 'EDIT-1'
+    assert preview['sample']['updated'][0]['changes'] == {
+        'price': {'from': 2.0, 'to': 2.5},
+        'active': {'from': True, 'to': False}
+    }
+    assert [p['sku'] for p in preview['sample']['deleted']] == (['GONE-1'] if replace else [])
+    assert {p.sku: (p.name, p.price, p.updated_at) for p in Product.query.all()} == before
+
+def test_import_options_dry_run():
+    from app.services.import_service import ImportService
+    
+    assert ImportService.get_import_options({'dry_run': 'yes'})['dry_run'] is True
+    assert 'dry_run' not in ImportService.get_import_options({'dry_run': 'no'})
+
+def test_columnar_import_reports_rows_with_extra_fields_like_row_path(app, tmp_path, mocker):
+    from app.tasks.csv_import import process_csv_file
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text(
+        "sku,name,price,active\n"
+        "A-1,First,1.00,true\n"
+        "A-2,Second,2.x,50,true\n"
+        + "".join(f"B-{i},Item {i},{i}.00,true\n" for i in range(30))
+    )
+    app.config['IMPORT_FRAME_ROWS'] = 8
+    
+    outcomes = []
+    for columnar in (False, True):
+        tracker = mocker.Mock()
+        result = process_csv_file(str(csv_file), 'job-id', tracker, columnar=columnar)
+        messages = [c.args[3] for c in tracker.publish_progress.call_args_list if 'Validation error' in c.args[3]]
+        outcomes.append((result['processed'], result['success'], result['errors'], messages))
+    
+    assert outcomes[0] == outcomes[1]
+    assert outcomes[1][:3] == (32, 31, 1)
+    assert outcomes[1][3] and 'Row 2' in outcomes[1][3][0]
@@ -27,3 +27,66 @@ def test_upload_to_import_flow(client, mocker):
     
     # Verify task called
     mock_task.assert_called_once()
+
+def test_resume_failed_job(client, tmp_path, mocker):
+    from app.services.import_service import ImportService
+    
+    mock_task = mocker.patch('app.tasks.csv_import.process_csv_import.delay')
+    
+    csv_file = tmp_path / 'products.csv'
+    csv_file.write_text("sku,name,price\nRESUME-1,Resume Product,1.00\n")
+    job = ImportService.create_import_job('products.csv', filepath=str(csv_file), options={'engine': 'values'})
+    
+    response = client.post(f'/api/jobs/{job.id}/resume')
+    assert response.status_code == 409
+    
+    ImportService.update_job_status(job.id, 'FAILURE', error_message='boom', checkpoint={'row': 1000})
+    response = client.post(f'/api/jobs/{job.id}/resume')
+    assert response.status_code == 202
+    assert response.get_json()['resume_from_row'] == 1000
+    mock_task.assert_called_once_with(job.id, str(csv_file), {'engine': 'values'})
+    assert ImportService.get_job(job.id).status == 'PENDING'
+
+def test_completed_job_exposes_metrics(client, mocker):
+    from app.services.import_service import ImportService
+    from app.tasks.csv_import import complete_import
+    
+    mocker.patch('app.services.webhook_service.WebhookService.trigger_webhooks')
+    mocker.patch('app.api.job_api.ProgressTracker').return_value.get_progress.return_value = None
+    
+    job = ImportService.create_import_job('products.csv')
+    metrics = {'wall_seconds': 1.5, 'rows': 10, 'rows_per_second': 6.7, 'stages': {'parse': 0.2, 'upsert': 1.1}}
+    result = {'processed': 10, 'success': 10, 'errors': 0, 'inserted': 10, 'updated': 0, 'unchanged': 0, 'metrics': metrics}
+    complete_import(job.id, '/nonexistent/products.csv', result, mocker.Mock())
+    
+    response = client.get(f'/api/jobs/{job.id}')
+    assert response.status_code == 200
+    assert response.get_json()['metrics'] == metrics
+    
+    response = client.get(f'/api/jobs/{job.id}', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+def test_streaming_upload_enqueues_before_reading_body(client, app, mocker):
+    import os
+    from app.utils.spool import UploadSpool
+    
+    spool_sizes = []
+    mock_task = mocker.patch('app.tasks.csv_import.process_csv_import.delay')
+    mock_task.side_effect = lambda job_id, filepath, options: spool_sizes.append(os.path.getsize(filepath))
+    
+    body = b"sku,name,price\nSTREAM-1,Streamed Product,3.00\n"
+    response = client.post('/api/products/upload/stream?filename=streamed.csv&dedupe=true', data=body, content_type='text/csv')
+    
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data['bytes_received'] == len(body)
+    assert spool_sizes == [0]
+    
+    job = ImportJob.query.filter_by(id=data['job_id']).first()
+    assert job.options == {'dedupe': True, 'stream': True, 'format': 'csv'}
+    with open(job.filepath, 'rb') as f:
+        assert f.read() == body
+    assert UploadSpool.is_complete(job.filepath)
+    
+    response = client.post('/api/products/upload/stream?filename=streamed.txt', data=body, content_type='text/csv')
+    assert response.status_code == 400
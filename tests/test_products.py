@@ -69,3 +69,424 @@ def test_bulk_delete_products(client, mocker):
     data = response.get_json()
     assert data['job_id'] is not None
     mock_task.assert_called_once()
+
+def test_export_products_csv(client):
+    db.session.add_all([
+        Product(sku='EXP-1', name='Export One', price=10.5, description='has, comma', active=True),
+        Product(sku='EXP-2', name='Export Two', price=0, active=False),
+        Product(sku='OTHER-1', name='Other', price=3, active=True)
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/products/export?format=csv&active=true')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+    
+    import csv
+    import io
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['sku'] for r in rows] == ['EXP-1', 'OTHER-1']
+    assert rows[0]['description'] == 'has, comma'
+    assert rows[0]['active'] == 'true'
+    assert float(rows[0]['price']) == 10.5
+
+def test_export_products_ndjson(client):
+    db.session.add_all([
+        Product(sku='EXP-1', name='Export One', price=10.5),
+        Product(sku='EXP-2', name='Export Two', price=2)
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/products/export?format=ndjson&sku=exp-2')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    
+    import json
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record == Product.query.filter_by(sku='EXP-2').first().to_dict()
+
+def test_export_products_invalid_format(client):
+    response = client.get('/api/products/export?format=xml')
+    assert response.status_code == 400
+
+def test_get_products_cursor_pagination(client):
+    from datetime import datetime, timedelta
+    base = datetime(2026, 1, 1)
+    # Two products share a created_at so the id tie-breaker is exercised
+    db.session.add_all([
+        Product(sku=f'PAGE-{i}', name=f'Page {i}', price=1, created_at=base + timedelta(minutes=i // 2))
+        for i in range(5)
+    ])
+    db.session.commit()
+    
+    seen = []
+    cursor = ''
+    pages = 0
+    while cursor is not None:
+        response = client.get('/api/products', query_string={'limit': 2, 'cursor': cursor})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total'] == 5
+        seen.extend(p['sku'] for p in data['products'])
+        cursor = data['next_cursor']
+        pages += 1
+    
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 5
+    
+    offset_skus = [p['sku'] for p in client.get('/api/products?limit=5').get_json()['products']]
+    assert seen == offset_skus
+
+def test_get_products_invalid_cursor(client):
+    response = client.get('/api/products?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def test_get_products_count_modes(client, mocker):
+    db.session.add_all([Product(sku=f'CNT-{i}', name=f'Count {i}', price=1) for i in range(3)])
+    db.session.commit()
+    
+    data = client.get('/api/products?count=exact').get_json()
+    assert data['total'] == 3 and data['total_exact'] is True
+    
+    data = client.get('/api/products?count=none').get_json()
+    assert data['total'] is None and data['total_exact'] is False
+    assert len(data['products']) == 3
+    
+    # SQLite has no planner estimate, so estimate falls back to an exact count
+    data = client.get('/api/products?count=estimate').get_json()
+    assert data['total'] == 3 and data['total_exact'] is True
+    
+    from app.utils.db_helper import DatabaseHelper
+    mocker.patch.object(DatabaseHelper, 'estimate_count', return_value=250000)
+    data = client.get('/api/products?count=estimate').get_json()
+    assert data['total'] == 250000 and data['total_exact'] is False
+    
+    assert client.get('/api/products?count=maybe').status_code == 400
+
+def test_search_products_sqlite_fallback(client):
+    db.session.add_all([
+        Product(sku='SRCH-1', name='Red Widget', price=1, description='small steel part'),
+        Product(sku='SRCH-2', name='Gadget', price=1, description='a red widget holder'),
+        Product(sku='SRCH-3', name='Blue Widget', price=1, description='large part', active=False),
+        Product(sku='SRCH-4', name='Unrelated', price=1)
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/products/search?q=red widget')
+    assert response.status_code == 200
+    data = response.get_json()
+    # A name containing the whole query ranks above a description match
+    assert [p['sku'] for p in data['products']] == ['SRCH-1', 'SRCH-2']
+    assert data['total'] == 2
+    
+    data = client.get('/api/products/search?q=widget&active=true').get_json()
+    assert {p['sku'] for p in data['products']} == {'SRCH-1', 'SRCH-2'}
+    
+    assert client.get('/api/products/search?q=').status_code == 400
+
+def test_sku_suggest(client):
+    db.session.add_all([
+        Product(sku=sku, name=sku, price=1)
+        for sku in ['ABC-2', 'abc-1', 'ABD-1', 'A_C-1', 'XYZ-1']
+    ])
+    db.session.commit()
+    
+    data = client.get('/api/products/sku-suggest?prefix=aBc').get_json()
+    assert data['skus'] == ['abc-1', 'ABC-2']
+    
+    assert client.get('/api/products/sku-suggest?prefix=ab&limit=2').get_json()['skus'] == ['abc-1', 'ABC-2']
+    # LIKE wildcards in the prefix are matched literally
+    assert client.get('/api/products/sku-suggest?prefix=a_').get_json()['skus'] == ['A_C-1']
+    assert client.get('/api/products/sku-suggest?prefix=').status_code == 400
+
+def test_sku_suggest_cache_follows_listing_generation(client, mocker):
+    from app.services.product_service import ProductService
+    from app.utils.redis_cache import RedisCache
+    ProductService._suggest_cache.clear()
+    generation = mocker.patch.object(RedisCache, 'generation', return_value=1)
+    
+    db.session.add(Product(sku='GEN-1', name='Gen', price=1))
+    db.session.commit()
+    assert ProductService.suggest_skus('gen') == ['GEN-1']
+    
+    # Written behind the service's back, as an import does: the cached result stands
+    db.session.add(Product(sku='GEN-2', name='Gen', price=1))
+    db.session.commit()
+    assert ProductService.suggest_skus('gen') == ['GEN-1']
+    
+    # Any write, on any worker, advances the listing generation
+    generation.return_value = 2
+    assert ProductService.suggest_skus('gen') == ['GEN-1', 'GEN-2']
+    generation.assert_called_with('listing')
+    ProductService._suggest_cache.clear()
+
+def test_list_count_cache_follows_listing_generation(client, mocker):
+    from app.utils.redis_cache import RedisCache
+    
+    store = {}
+    mocker.patch.object(RedisCache, 'get', side_effect=store.get)
+    mocker.patch.object(RedisCache, 'set', side_effect=lambda key, value, ttl: store.__setitem__(key, value))
+    generation = mocker.patch.object(RedisCache, 'generation', return_value=1)
+    
+    db.session.add(Product(sku='CNT-1', name='Counted', price=1))
+    db.session.commit()
+    assert client.get('/api/products').get_json()['total'] == 1
+    
+    db.session.add(Product(sku='CNT-2', name='Counted', price=1))
+    db.session.commit()
+    generation.return_value = 2
+    # The list is rebuilt under the new generation, and so is its total
+    assert client.get('/api/products').get_json()['total'] == 2
+
+def test_product_lookup_cache(client, mocker):
+    from app.services.product_service import ProductService
+    from app.utils.redis_cache import RedisCache
+    
+    # Stand-in for Redis: a dict behind the RedisCache interface
+    store = {RedisCache.generation_key('catalog'): 1}
+    mocker.patch.object(RedisCache, 'get_many', side_effect=lambda *keys: [store.get(k) for k in keys])
+    mocker.patch.object(RedisCache, 'set', side_effect=lambda key, value, ttl: store.__setitem__(key, value))
+    mocker.patch.object(RedisCache, 'bump', side_effect=lambda *names, ttl=None: [
+        store.__setitem__(RedisCache.generation_key(n), store.get(RedisCache.generation_key(n), 0) + 1) for n in names
+    ])
+    ProductService._product_cache.clear()
+    
+    product = ProductService.create_product({'sku': 'Cache-1', 'name': 'Cached', 'price': 5})
+    load = mocker.spy(ProductService, 'get_product_by_id')
+    
+    assert client.get(f'/api/products/{product.id}').get_json()['name'] == 'Cached'
+    assert client.get(f'/api/products/{product.id}').get_json()['name'] == 'Cached'
+    assert load.call_count == 1
+    assert client.get('/api/products/sku/cache-1').get_json()['id'] == product.id
+    
+    # Writes through the service invalidate their keys
+    client.put(f'/api/products/{product.id}', json={'name': 'Renamed'})
+    assert client.get(f'/api/products/{product.id}').get_json()['name'] == 'Renamed'
+    assert client.get('/api/products/sku/CACHE-1').get_json()['name'] == 'Renamed'
+    
+    # Bulk changes advance the generation instead; the Redis entry is then ignored
+    Product.query.filter_by(id=product.id).update({'name': 'Imported'})
+    db.session.commit()
+    ProductService._product_cache.clear()
+    store[RedisCache.generation_key('catalog')] = 2
+    assert client.get(f'/api/products/{product.id}').get_json()['name'] == 'Imported'
+    
+    client.delete(f'/api/products/{product.id}')
+    assert client.get(f'/api/products/{product.id}').status_code == 404
+    assert client.get('/api/products/sku/cache-1').status_code == 404
+    ProductService._product_cache.clear()
+
+def test_product_lookup_cache_ignores_load_racing_an_update(client, mocker):
+    from app.services.product_service import ProductService
+    from app.utils.redis_cache import RedisCache
+    
+    store = {}
+    mocker.patch.object(RedisCache, 'get_many', side_effect=lambda *keys: [store.get(k) for k in keys])
+    mocker.patch.object(RedisCache, 'set', side_effect=lambda key, value, ttl: store.__setitem__(key, value))
+    mocker.patch.object(RedisCache, 'bump', side_effect=lambda *names, ttl=None: [
+        store.__setitem__(RedisCache.generation_key(n), store.get(RedisCache.generation_key(n), 0) + 1) for n in names
+    ])
+    ProductService._product_cache.clear()
+    
+    product = ProductService.create_product({'sku': 'Race-1', 'name': 'Before', 'price': 5})
+    product_id = product.id
+    stale = product.to_dict()
+    
+    # A lookup loads the old row, then an update commits and invalidates
+    # before the lookup stores what it loaded
+    def load_then_update():
+        ProductService.update_product(product_id, {'name': 'After'})
+        return mocker.Mock(to_dict=lambda: stale)
+    key = f'products:id:{product_id}'
+    assert ProductService._cached_product(key, load_then_update)['name'] == 'Before'
+    assert store[key]['product']['name'] == 'Before'
+    
+    ProductService._product_cache.clear()
+    assert ProductService.get_product_payload(product_id)['name'] == 'After'
+    assert store[key]['product']['name'] == 'After'
+    ProductService._product_cache.clear()
+
+def test_product_conditional_get(client):
+    product = Product(sku='ETAG-1', name='Tagged', price=1)
+    db.session.add(product)
+    db.session.commit()
+    
+    response = client.get(f'/api/products/{product.id}')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+    
+    response = client.get(f'/api/products/{product.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    client.put(f'/api/products/{product.id}', json={'name': 'Retagged'})
+    response = client.get(f'/api/products/{product.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_product_list_conditional_get(client, mocker):
+    from app.services.product_service import ProductService
+    db.session.add(Product(sku='ETAG-LIST-1', name='Listed', price=1))
+    db.session.commit()
+    
+    # Without Redis the tag is a hash of the page
+    etag = client.get('/api/products?limit=10').headers['ETag']
+    assert client.get('/api/products?limit=10', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/products?limit=5', headers={'If-None-Match': etag}).status_code == 200
+    
+    # With Redis it comes from the listing generation and the page is not even queried
+    mocker.patch.object(ProductService, 'listing_generation', return_value=7)
+    etag = client.get('/api/products?limit=10').headers['ETag']
+    get_products = mocker.spy(ProductService, 'get_products')
+    assert client.get('/api/products?limit=10', headers={'If-None-Match': etag}).status_code == 304
+    assert get_products.call_count == 0
+    
+    ProductService.listing_generation.return_value = 8
+    assert client.get('/api/products?limit=10', headers={'If-None-Match': etag}).status_code == 200
+
+def test_product_list_matches_to_dict_and_sparse_fields(client, app):
+    from datetime import datetime
+    from flask import jsonify
+    db.session.add_all([
+        Product(sku='FAST-1', name='Café', price=12.5, description=None,
+                created_at=datetime(2026, 1, 1, 8, 30, 0, 123456)),
+        Product(sku='FAST-2', name='Free', price=0, active=False, created_at=datetime(2026, 1, 2))
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/products')
+    products = Product.query.order_by(Product.created_at.desc()).all()
+    expected = jsonify({
+        'products': [p.to_dict() for p in products],
+        'total': 2, 'total_exact': True, 'limit': 50, 'offset': 0
+    }).get_data()
+    assert response.data == expected
+    
+    data = client.get('/api/products?fields=sku,price').get_json()
+    assert data['products'] == [{'sku': 'FAST-2', 'price': None}, {'sku': 'FAST-1', 'price': 12.5}]
+    
+    assert client.get('/api/products?fields=sku,cost').status_code == 400
+
+def test_batch_product_operations(client):
+    keep = Product(sku='BATCH-KEEP', name='Keep', price=5, description='same')
+    change = Product(sku='BATCH-CHANGE', name='Change', price=5)
+    gone = Product(sku='BATCH-GONE', name='Gone', price=1)
+    db.session.add_all([keep, change, gone])
+    db.session.commit()
+    keep_id, change_id, gone_id = keep.id, change.id, gone.id
+    
+    operations = [
+        {'op': 'upsert', 'sku': 'BATCH-NEW', 'name': 'New', 'price': 9.99},
+        {'op': 'upsert', 'sku': 'batch-keep', 'name': 'Keep', 'price': 5, 'description': 'same'},
+        {'op': 'patch', 'id': change_id, 'price': 7.25},
+        {'op': 'delete', 'sku': 'BATCH-GONE'},
+        {'op': 'delete', 'sku': 'BATCH-MISSING'},
+        {'op': 'patch', 'sku': 'BATCH-KEEP', 'name': 'Twice'},
+        {'op': 'upsert', 'sku': 'BATCH-BAD', 'name': 'Bad', 'price': -1},
+        {'op': 'rename', 'sku': 'BATCH-KEEP'}
+    ]
+    response = client.post('/api/products/batch', json={'operations': operations})
+    assert response.status_code == 200
+    data = response.get_json()
+    
+    statuses = [r['status'] for r in data['results']]
+    assert statuses == ['inserted', 'unchanged', 'patched', 'deleted', 'not_found', 'invalid', 'invalid', 'invalid']
+    assert data['summary'] == {'inserted': 1, 'unchanged': 1, 'patched': 1, 'deleted': 1, 'not_found': 1, 'invalid': 3}
+    assert data['results'][1]['id'] == keep_id
+    assert 'earlier operation' in data['results'][5]['error']
+    
+    db.session.expire_all()
+    new = Product.query.filter_by(sku='BATCH-NEW').first()
+    assert data['results'][0]['id'] == new.id
+    assert float(db.session.get(Product, change_id).price) == 7.25
+    assert db.session.get(Product, gone_id) is None
+    assert Product.query.filter_by(sku='BATCH-BAD').first() is None
+
+def test_batch_product_operations_catch_sku_and_id_of_same_product(client):
+    product = Product(sku='BATCH-BOTH', name='Both', price=5)
+    db.session.add(product)
+    db.session.commit()
+    product_id = product.id
+    
+    data = client.post('/api/products/batch', json={'operations': [
+        {'op': 'patch', 'sku': 'batch-both', 'name': 'Patched'},
+        {'op': 'delete', 'id': product_id}
+    ]}).get_json()
+    
+    assert [r['status'] for r in data['results']] == ['patched', 'invalid']
+    assert 'earlier operation' in data['results'][1]['error']
+    db.session.expire_all()
+    assert db.session.get(Product, product_id).name == 'Patched'
+
+def test_batch_product_operations_rejects_bad_payload(client):
+    assert client.post('/api/products/batch', json={'operations': []}).status_code == 400
+    assert client.post('/api/products/batch', json=[{'op': 'delete', 'id': 1}]).status_code == 400
+
+def test_bulk_delete_task_with_filters(app, mocker):
+    from datetime import datetime
+    from app.services.import_service import ImportService
+    from app.tasks.bulk_delete import bulk_delete_products
+    
+    mocker.patch('app.tasks.bulk_delete.ProgressTracker')
+    app.config['BULK_DELETE_RANGE_SIZE'] = 3
+    old, new = datetime(2025, 1, 1), datetime(2026, 6, 1)
+    db.session.add_all([
+        Product(sku=f'OLD-{i}', name='Old', price=1, active=i % 2 == 0, updated_at=old) for i in range(6)
+    ] + [
+        Product(sku=f'NEW-{i}', name='New', price=1, active=False, updated_at=new) for i in range(4)
+    ])
+    db.session.commit()
+    
+    job = ImportService.create_import_job('bulk_delete_products.csv')
+    filters = {'active': False, 'sku_prefix': 'old-', 'updated_before': '2026-01-01T00:00:00'}
+    # run() executes in the test app context rather than the Celery app context
+    result = bulk_delete_products.run(job.id, filters)
+    
+    assert result['deleted'] == 3
+    db.session.expire_all()
+    assert Product.query.count() == 7
+    assert Product.query.filter(Product.sku.like('OLD-%'), Product.active.is_(False)).count() == 0
+    
+    result = bulk_delete_products.run(job.id)
+    assert result['deleted'] == 7
+    assert Product.query.count() == 0
+    assert ImportService.get_job(job.id).status == 'SUCCESS'
+
+def test_bulk_delete_steps_over_id_gaps(app, mocker):
+    from app.services.import_service import ImportService
+    from app.services.product_service import ProductService
+    from app.tasks.bulk_delete import bulk_delete_products
+    from app.utils.db_helper import DatabaseHelper
+    
+    mocker.patch('app.tasks.bulk_delete.ProgressTracker')
+    app.config['BULK_DELETE_RANGE_SIZE'] = 2
+    db.session.add_all([
+        Product(id=product_id, sku=f'GAP-{product_id}', name='Sparse', price=1)
+        for product_id in (1, 5000, 90000, 2000000, 2000001)
+    ])
+    db.session.commit()
+    
+    delete_range = mocker.spy(DatabaseHelper, 'delete_product_range')
+    catalog_changed = mocker.spy(ProductService, 'catalog_changed')
+    job = ImportService.create_import_job('bulk_delete_products.csv')
+    result = bulk_delete_products.run(job.id, {'sku_prefix': 'gap-'})
+    
+    assert result['deleted'] == 5
+    assert [c.args[:2] for c in delete_range.call_args_list] == [(1, 5000), (90000, 2000000), (2000001, 2000001)]
+    # Caches are invalidated as soon as each range is committed
+    assert catalog_changed.call_count == 3
+    assert Product.query.count() == 0
+
+def test_bulk_delete_rejects_bad_filters(client, mocker):
+    mock_task = mocker.patch('app.tasks.bulk_delete.bulk_delete_products.delay')
+    
+    payload = {'confirmation': 'DELETE_ALL', 'filters': {'updated_before': 'last week'}}
+    assert client.post('/api/products/delete_all', json=payload).status_code == 400
+    
+    payload = {'confirmation': 'DELETE_ALL', 'filters': {'active': False}}
+    assert client.post('/api/products/delete_all', json=payload).status_code == 202
+    mock_task.assert_called_once_with(mocker.ANY, {'active': False})